@@ -5,16 +5,19 @@ from plotly.subplots import make_subplots
 import plotly.io as pio
 
 
-def create_plotly_tabs_dashboard(file_path):
+def create_plotly_tabs_dashboard(file_path, sheets=None, output_path="vijayadashami_plotly_dashboard.html"):
     """Create a Plotly dashboard with proper tabs for both sheets"""
 
-    # Read Excel file
-    try:
-        excel_data = pd.read_excel(file_path, sheet_name=None, engine='openpyxl')
-        print("Available sheets:", list(excel_data.keys()))
-    except Exception as e:
-        print(f"Error reading Excel file: {e}")
-        return None
+    # Read Excel file (unless the sheets were already loaded, e.g. by build.py)
+    if sheets is not None:
+        excel_data = sheets
+    else:
+        try:
+            excel_data = pd.read_excel(file_path, sheet_name=None, engine='openpyxl')
+            print("Available sheets:", list(excel_data.keys()))
+        except Exception as e:
+            print(f"Error reading Excel file: {e}")
+            return None
 
     # Process Sheet3 - Summary Data
     df_summary = excel_data['Sheet3'].copy()
@@ -332,10 +335,10 @@ def create_plotly_tabs_dashboard(file_path):
     html_content += charts_js
 
     # Save the complete dashboard
-    with open("vijayadashami_plotly_dashboard.html", "w", encoding='utf-8') as f:
+    with open(output_path, "w", encoding='utf-8') as f:
         f.write(html_content)
 
-    print("✅ Plotly Dashboard with Tabs saved as 'vijayadashami_plotly_dashboard.html'")
+    print(f"✅ Plotly Dashboard with Tabs saved as '{output_path}'")
     return html_content
 
 
@@ -0,0 +1,306 @@
+# Make-style build of all dashboard artifacts
+#
+# ingest -> aggregates -> figures -> artifacts are modelled as a DAG of nodes.
+# Each node has a content-hash fingerprint over its input files, the source
+# of the code that builds it and the outputs of the nodes it depends on. A
+# node is rebuilt only when that fingerprint changed or one of its outputs is
+# missing or was modified; when a rebuilt node produces identical outputs its
+# dependents stay up to date. Nodes whose dependencies are done run in
+# parallel in separate processes.
+#
+# Usage: python build.py [node ...] [--jobs N] [--force] [--dry-run] [--workbook PATH]
+#   (PATH may also be a directory of CSV/JSON/Parquet exports, see ingest.py)
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from name_registry import REGISTRY_DIR, REGISTRY_FILE
+
+WORKBOOK = "Vijayadashami_VIJ_2025.xlsx"
+BUILD_DIR = "build"
+STATE_FILE = os.path.join(BUILD_DIR, "build_state.json")
+
+SHEETS_DIR = os.path.join(BUILD_DIR, "sheets")
+AGGREGATES_DIR = os.path.join(BUILD_DIR, "aggregates")
+FIGURES_DIR = os.path.join(BUILD_DIR, "figures")
+
+
+def load_ingested():
+    """Read the cleaned sheets written by the ingest node"""
+    import pandas as pd
+
+    return {name: pd.read_parquet(os.path.join(SHEETS_DIR, f"{name}.parquet"))
+            for name in ['Sheet3', 'Sheet8']}
+
+
+def build_ingest(workbook):
+    """Read and clean the workbook once; everything downstream reads the Parquet copies"""
+    from shared_data import read_sheets
+
+    os.makedirs(SHEETS_DIR, exist_ok=True)
+    for name, df in read_sheets(workbook).items():
+        df.to_parquet(os.path.join(SHEETS_DIR, f"{name}.parquet"), index=False)
+
+
+def build_validation(workbook):
+    """Data-quality violations report"""
+    from validation import validate
+
+    validate(load_ingested())['report'].to_csv("vijayadashami_violations.csv", index=False)
+
+
+def build_aggregates(workbook):
+    """Summary tables (Nagara summary, Vasati ranking, Utsava rollup) as Parquet"""
+    from export_results import export_bundle
+
+    export_bundle(load_ingested(), AGGREGATES_DIR, 'parquet')
+
+
+def build_figures(workbook):
+    """Per-Nagara figures and the Utsava summary figure as JSON"""
+    import pandas as pd
+
+    from figure_factory import DEFAULT_TEMPLATE, bar_figure, figure_json, nagara_figures
+
+    detailed = pd.read_parquet(os.path.join(AGGREGATES_DIR, "utsava.parquet"))
+    rollup = pd.read_parquet(os.path.join(AGGREGATES_DIR, "utsava_rollup.parquet"))
+    rollup = rollup.sort_values('Grand Total', ascending=True)
+
+    os.makedirs(FIGURES_DIR, exist_ok=True)
+    figures = nagara_figures(detailed, template=DEFAULT_TEMPLATE)
+    figures['Utsava Summary'] = bar_figure(rollup['Nagara'], rollup['Grand Total'],
+                                           'Grand Total per Nagara (Utsava)',
+                                           x_label='Nagara', y_label='Total',
+                                           template=DEFAULT_TEMPLATE)
+    with open(os.path.join(FIGURES_DIR, "figures.json"), "w", encoding='utf-8') as f:
+        f.write(figure_json(figures))
+
+
+def build_plotly_dashboard(workbook):
+    """Tabbed Plotly HTML dashboard (Vijayadashami.py)"""
+    from Vijayadashami import create_plotly_tabs_dashboard
+
+    create_plotly_tabs_dashboard(workbook, sheets=load_ingested())
+
+
+def build_matplotlib_dashboard(workbook):
+    """Static Matplotlib PNG/PDF dashboard (design4.py)"""
+    import matplotlib
+    matplotlib.use('Agg')
+
+    from design4 import create_matplotlib_dashboard
+
+    create_matplotlib_dashboard(workbook, sheets=load_ingested(), show=False)
+
+
+def build_results_workbook(workbook):
+    """Consolidated results workbook (export_results.py)"""
+    from export_results import export_workbook
+
+    export_workbook(load_ingested(), "vijayadashami_results.xlsx")
+
+
+def aggregate_outputs():
+    """Parquet files written by the aggregates node"""
+    return [os.path.join(AGGREGATES_DIR, f"{name}.parquet")
+            for name in ['nagara_summary', 'vasati_ranking', 'utsava_rollup', 'utsava']]
+
+
+# name -> dependencies, input files, code files, outputs, build function
+NODES = {
+    'ingest': {
+        'deps': [],
+        'inputs': ['{workbook}', os.path.relpath(os.path.join(REGISTRY_DIR, REGISTRY_FILE))],
+        'code': ['build.py', 'shared_data.py', 'name_registry.py', 'ingest.py'],
+        'outputs': [os.path.join(SHEETS_DIR, 'Sheet3.parquet'), os.path.join(SHEETS_DIR, 'Sheet8.parquet')],
+        'run': build_ingest,
+    },
+    'validation': {
+        'deps': ['ingest'],
+        'inputs': [],
+        'code': ['build.py', 'validation.py'],
+        'outputs': ['vijayadashami_violations.csv'],
+        'run': build_validation,
+    },
+    'aggregates': {
+        'deps': ['ingest'],
+        'inputs': [],
+        'code': ['build.py', 'export_results.py', 'shared_data.py'],
+        'outputs': aggregate_outputs(),
+        'run': build_aggregates,
+    },
+    'figures': {
+        'deps': ['aggregates'],
+        'inputs': [],
+        'code': ['build.py', 'figure_factory.py'],
+        'outputs': [os.path.join(FIGURES_DIR, 'figures.json')],
+        'run': build_figures,
+    },
+    'plotly_dashboard': {
+        'deps': ['ingest'],
+        'inputs': [],
+        'code': ['build.py', 'Vijayadashami.py'],
+        'outputs': ['vijayadashami_plotly_dashboard.html'],
+        'run': build_plotly_dashboard,
+    },
+    'matplotlib_dashboard': {
+        'deps': ['ingest'],
+        'inputs': [],
+        'code': ['build.py', 'design4.py'],
+        'outputs': ['vijayadashami_matplotlib_dashboard.png', 'vijayadashami_matplotlib_dashboard.pdf'],
+        'run': build_matplotlib_dashboard,
+    },
+    'results_workbook': {
+        'deps': ['ingest'],
+        'inputs': [],
+        'code': ['build.py', 'export_results.py', 'shared_data.py'],
+        'outputs': ['vijayadashami_results.xlsx'],
+        'run': build_results_workbook,
+    },
+}
+
+
+def file_hash(path):
+    """sha256 of a file's content (or of every file in a directory), or 'missing'"""
+    if not os.path.exists(path):
+        return 'missing'
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            digest.update(f"{name}:{file_hash(os.path.join(path, name))}".encode('utf-8'))
+        return digest.hexdigest()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint(name, output_hashes, workbook):
+    """Content fingerprint of a node: inputs, code and the outputs of its dependencies"""
+    node = NODES[name]
+    digest = hashlib.sha256(name.encode('utf-8'))
+    inputs = [path.format(workbook=workbook) for path in node['inputs']]
+    for path in inputs + node['code']:
+        digest.update(f"{path}:{file_hash(path)}".encode('utf-8'))
+    for dep in node['deps']:
+        digest.update(f"{dep}:{output_hashes[dep]}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def outputs_hash(name):
+    """Combined content hash of a node's outputs"""
+    return {path: file_hash(path) for path in NODES[name]['outputs']}
+
+
+def is_up_to_date(name, fp, state):
+    """A node is current if it was built with this fingerprint and its outputs are untouched"""
+    recorded = state.get(name)
+    return (recorded is not None and recorded['fingerprint'] == fp
+            and 'missing' not in recorded['outputs'].values()
+            and recorded['outputs'] == outputs_hash(name))
+
+
+def run_node(name, workbook):
+    """Build one node (runs in a worker process)"""
+    import plotly.io as pio
+
+    # Workers are reused and importing Streamlit (shared_data) switches plotly's
+    # default template, so pin it: outputs must not depend on earlier nodes
+    pio.templates.default = 'plotly'
+    start = time.perf_counter()
+    NODES[name]['run'](workbook)
+    return time.perf_counter() - start
+
+
+def with_dependencies(targets):
+    """Targets plus everything they depend on, in topological order"""
+    ordered = []
+
+    def visit(name):
+        if name not in ordered:
+            for dep in NODES[name]['deps']:
+                visit(dep)
+            ordered.append(name)
+
+    for target in targets:
+        visit(target)
+    return ordered
+
+
+def load_state():
+    """Fingerprints and output hashes recorded by the last build"""
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(state):
+    """Record fingerprints and output hashes for the next build"""
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    with open(STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def build(targets=None, jobs=None, force=False, dry_run=False, workbook=WORKBOOK):
+    """Rebuild the stale nodes needed for `targets` (all nodes by default)"""
+    order = with_dependencies(targets or list(NODES))
+    state = load_state()
+    output_hashes = {}
+    pending = list(order)
+    running = {}
+    rebuilt = []
+
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        while pending or running:
+            # Schedule every node whose dependencies are finished
+            for name in [n for n in pending if all(dep in output_hashes for dep in NODES[n]['deps'])]:
+                pending.remove(name)
+                fp = fingerprint(name, output_hashes, workbook)
+                if not force and is_up_to_date(name, fp, state):
+                    print(f"·  {name:22s} up to date")
+                    output_hashes[name] = json.dumps(state[name]['outputs'], sort_keys=True)
+                elif dry_run:
+                    print(f"!  {name:22s} stale")
+                    output_hashes[name] = 'stale'
+                else:
+                    running[pool.submit(run_node, name, workbook)] = (name, fp)
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, fp = running.pop(future)
+                seconds = future.result()
+                outputs = outputs_hash(name)
+                state[name] = {'fingerprint': fp, 'outputs': outputs}
+                output_hashes[name] = json.dumps(outputs, sort_keys=True)
+                rebuilt.append(name)
+                save_state(state)
+                print(f"✅ {name:22s} built in {seconds:.1f}s")
+
+    return rebuilt
+
+
+# Main execution
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {'force': '--force' in args, 'dry_run': '--dry-run' in args}
+    for flag, key, convert in [('--jobs', 'jobs', int), ('--workbook', 'workbook', str)]:
+        if flag in args:
+            i = args.index(flag)
+            options[key] = convert(args[i + 1])
+            del args[i:i + 2]
+    targets = [arg for arg in args if not arg.startswith('--')]
+
+    unknown = [target for target in targets if target not in NODES]
+    if unknown:
+        print(f"Unknown nodes: {', '.join(unknown)} (available: {', '.join(NODES)})")
+        sys.exit(1)
+
+    rebuilt = build(targets, **options)
+    print(f"{len(rebuilt)} node(s) rebuilt")
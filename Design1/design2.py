@@ -1,9 +1,12 @@
 # Save this as streamlit_dashboard.py
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from memory_budget import render_memory_panel
+from shared_data import shared_view
+from validation import render_validation_panel, shared_validation
+
 
 def create_streamlit_dashboard(file_path):
     """Create an interactive Streamlit dashboard"""
@@ -16,18 +19,10 @@ def create_streamlit_dashboard(file_path):
         initial_sidebar_state="expanded"
     )
 
-    # Read data
-    @st.cache_data
-    def load_data():
-        excel_data = pd.read_excel(file_path, sheet_name=None, engine='openpyxl')
-        df_summary = excel_data['Sheet3'].dropna(how='all')
-        df_detailed = excel_data['Sheet8'].dropna(how='all')
-        df_summary.columns = df_summary.columns.str.strip()
-        df_detailed.columns = df_detailed.columns.str.strip()
-        return df_summary, df_detailed
-
+    # Read data (shared read-only views, one copy per process for all sessions)
     try:
-        df_summary, df_detailed = load_data()
+        df_summary = shared_view(file_path, 'Sheet3', derived=('Representation_Rate', 'Efficiency'))
+        df_detailed = shared_view(file_path, 'Sheet8')
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return
@@ -35,7 +30,11 @@ def create_streamlit_dashboard(file_path):
     # Sidebar
     st.sidebar.title("🎛️ Dashboard Controls")
     selected_tab = st.sidebar.radio("Select View:",
-                                    ["📊 Summary Overview", "📈 Detailed Analysis", "💡 Insights"])
+                                    ["📊 Summary Overview", "📈 Detailed Analysis", "💡 Insights",
+                                     "🧪 Data Quality"])
+
+    with st.sidebar.expander("Memory"):
+        render_memory_panel()
 
     # Main content
     st.title("🎉 Vijayadashami 2025 Dashboard")
@@ -88,9 +87,7 @@ def create_streamlit_dashboard(file_path):
                 st.plotly_chart(fig, use_container_width=True)
 
         with col4:
-            if all(col in df_summary.columns for col in ['Total Booths', 'Represented Booths']):
-                df_summary['Representation_Rate'] = (
-                            df_summary['Represented Booths'] / df_summary['Total Booths'] * 100).round(1)
+            if 'Representation_Rate' in df_summary.columns:
                 fig = px.bar(df_summary, x='Nagara', y='Representation_Rate',
                              title='Booth Representation Rate (%)')
                 st.plotly_chart(fig, use_container_width=True)
@@ -143,6 +140,10 @@ def create_streamlit_dashboard(file_path):
             fig.update_layout(barmode='stack', title='Participant Categories by Vasati')
             st.plotly_chart(fig, use_container_width=True)
 
+    elif selected_tab == "🧪 Data Quality":
+        st.header("🧪 Data Quality - Validation Report")
+        render_validation_panel(shared_validation(file_path)['report'])
+
     else:  # Insights tab
         st.header("💡 Key Insights & Analytics")
 
@@ -160,8 +161,7 @@ def create_streamlit_dashboard(file_path):
 
         with col2:
             # Efficiency analysis
-            if all(col in df_summary.columns for col in ['Grand Total', 'Total Vasati']):
-                df_summary['Efficiency'] = (df_summary['Grand Total'] / df_summary['Total Vasati']).round(1)
+            if 'Efficiency' in df_summary.columns:
                 fig = px.bar(df_summary, x='Nagara', y='Efficiency',
                              title='Efficiency (Attendance per Vasati)')
                 st.plotly_chart(fig, use_container_width=True)
@@ -1,30 +1,26 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 
+from figure_factory import bar_figure, pie_figure
+from memory_budget import cached_figure, render_memory_panel
+from shared_data import shared_view
+from validation import render_validation_panel, shared_validation
+
 # Page config for wide layout
 st.set_page_config(layout="wide")
 
 # Read the Excel file, focusing only on Sheet8 and Sheet3
 file_path = 'Design1/Vijayadashami_VIJ_2025.xlsx'
 
-
-@st.cache_data
-def load_sheets():
-    sheets = pd.read_excel(file_path, sheet_name=['Sheet8', 'Sheet3'])
-    return sheets
-
-
-sheets = load_sheets()
-
 # Streamlit app title
 st.title('Vijayadashami 2025 (VIJAYNAGARA BHAGA)')
 
 # Create main tabs for each sheet
-tab8, tab3 = st.tabs(['Vijayadashami Utsava', 'Patha Sanchalana'])
+tab8, tab3, tab_quality = st.tabs(['Vijayadashami Utsava', 'Patha Sanchalana', 'Data Quality'])
 
 with tab8:
-    df8 = sheets['Sheet8']
+    # Shared read-only view (with the Grand Total bins overlaid), never modify in place
+    df8 = shared_view(file_path, 'Sheet8', derived=('Bin',))
 
     # Summary: Group by Nagara for Grand Total
     df8_summary = df8.groupby('Nagara')['Grand Total'].sum().reset_index()
@@ -32,41 +28,22 @@ with tab8:
     df8_summary = df8_summary.sort_values('Grand Total', ascending=True).reset_index(drop=True)
 
     # Plot: Interactive bar chart with Plotly
-    fig8 = px.bar(df8_summary,
-                  x='Nagara',
-                  y='Grand Total',
-                  title='Grand Total per Nagara (Utsava)',
-                  labels={'Nagara': 'Nagara', 'Grand Total': 'Total'},
-                  color='Grand Total',
-                  color_continuous_scale='Viridis')
-
-    # Increase y-axis by 5% padding
-    y_max = df8_summary['Grand Total'].max()
-    y_padding = y_max * 0.25
-    fig8.update_layout(yaxis=dict(range=[0, y_max + y_padding]), height=500, showlegend=False)
-    # Customize x-axis: Increase font size and make bold
-    fig8.update_xaxes(tickfont=dict(size=14, family="Arial Black, sans-serif"))
-    # Add total count on each bar
-    fig8.update_traces(texttemplate='%{y}', textposition='outside', textfont=dict(size=16))
+    # (styled template from figure_factory: 25% y-padding, Arial Black ticks, totals on bars;
+    # the 'streamlit' plotly template is themed by the frontend; figures are shared
+    # through the budgeted figure cache)
+    fig8 = cached_figure(('utsava_summary', file_path), lambda: bar_figure(
+        df8_summary['Nagara'], df8_summary['Grand Total'],
+        'Grand Total per Nagara (Utsava)',
+        x_label='Nagara', y_label='Total',
+        color_scale='Viridis', height=500, template='streamlit'))
 
     # Plot 2: Top 5 Grand Total Attendance
     df8_top5 = df8.nlargest(5, 'Grand Total')[['Nagara', 'Vasati', 'Grand Total']]
-    fig8_top5 = px.bar(df8_top5,
-                       x='Vasati',
-                       y='Grand Total',
-                       title='Top 5 (Utsava)',
-                       labels={'Vasati': 'Vasati', 'Nagara': 'Nagara', 'Grand Total': 'Total'},
-                       color='Grand Total',
-                       color_continuous_scale='Reds')
-
-    # Increase y-axis by 5% padding
-    y_max_top5 = df8_top5['Grand Total'].max()
-    y_padding_top5 = y_max_top5 * 0.25
-    fig8_top5.update_layout(yaxis=dict(range=[0, y_max_top5 + y_padding_top5]), height=400, showlegend=False)
-    # Customize x-axis: Increase font size and make bold
-    fig8_top5.update_xaxes(tickfont=dict(size=14, family="Arial Black, sans-serif"))
-    # Add total count on each bar with increased font size
-    fig8_top5.update_traces(texttemplate='%{y}', textposition='outside', textfont=dict(size=16))
+    fig8_top5 = cached_figure(('utsava_top5', file_path), lambda: bar_figure(
+        df8_top5['Vasati'], df8_top5['Grand Total'],
+        'Top 5 (Utsava)',
+        x_label='Vasati', y_label='Total',
+        color_scale='Reds', height=400, template='streamlit'))
 
 
     # Interactive Selection: Select Nagara and show Vasati details
@@ -82,67 +59,34 @@ with tab8:
 
     # Plot 3: Grand Total per Vasati for selected Nagara
     if not df_selected.empty:
-        fig8_vasati = px.bar(df_selected,
-                             x='Vasati',
-                             y='Grand Total',
-                             title=f'Grand Total per Vasati in {selected_nagara}',
-                             labels={'Vasati': 'Vasati', 'Grand Total': 'Total'},
-                             color='Grand Total',
-                             color_continuous_scale='Greens')
-        # Increase y-axis by 5% padding
-        y_max_vasati = df_selected['Grand Total'].max()
-        y_padding_vasati = y_max_vasati * 0.25
-        fig8_vasati.update_layout(yaxis=dict(range=[0, y_max_vasati + y_padding_vasati]),
-                                  height=500, showlegend=False)
-        # Customize x-axis: Increase font size and make bold
-        fig8_vasati.update_xaxes(tickfont=dict(size=14, family="Arial Black, sans-serif"))
-        # Add total count on each bar with increased font size
-        fig8_vasati.update_traces(texttemplate='%{y}', textposition='outside', textfont=dict(size=16))
+        fig8_vasati = cached_figure(('utsava_vasati', file_path, selected_nagara), lambda: bar_figure(
+            df_selected['Vasati'], df_selected['Grand Total'],
+            f'Grand Total per Vasati in {selected_nagara}',
+            x_label='Vasati', y_label='Total',
+            color_scale='Greens', height=500, template='streamlit'))
     else:
         fig8_vasati = None
         st.warning(f"No data found for {selected_nagara}")
 
-    # Plot 4: Custom Bins Histogram of Grand Total
-    bin_edges = [0, 10, 25, 51, 75, 100,
-                 501]  # Edges for bins [0,9], [10,24], [25,50], [51,74], [75,99], [100,500]
-    bin_labels = ['0-9', '10-24', '25-50', '51-74', '75-99', '100-500']
-    bin_midpoints = [4.5, 17, 37.5, 62.5, 87, 300]  # Midpoints for tick labels
-
-    # Manually bin the data using pd.cut
-    df8['Bin'] = pd.cut(df8['Grand Total'], bins=bin_edges, labels=bin_labels, right=False, include_lowest=True)
+    # Plot 4: Custom Bins Histogram of Grand Total (bins from shared_data.BIN_EDGES)
     binned_df = df8.groupby('Bin', observed=True).size().reset_index(name='Frequency')
     binned_df = binned_df.sort_values('Bin')  # Ensure order
 
-    fig8_hist = px.bar(binned_df,
-                       x='Bin',
-                       y='Frequency',
-                       title='Grouping',
-                       labels={'Bin': 'Upasthiti', 'Frequency': 'Utsava Sankhye'},
-                       color='Frequency',
-                       color_continuous_scale='Oranges')
-
-    # Increase y-axis by 5% padding
-    y_max_hist = binned_df['Frequency'].max()
-    y_padding_hist = y_max_hist * 0.25
-    fig8_hist.update_layout(yaxis=dict(range=[0, y_max_hist + y_padding_hist]),
-                            height=400, showlegend=False,
-                            margin=dict(l=100))
-    # Customize x-axis
-    fig8_hist.update_xaxes(tickfont=dict(size=14, family="Arial Black, sans-serif"))
-
-    # Add total count on each bar with increased font size
-    fig8_hist.update_traces(texttemplate='%{y}', textposition='outside', textfont=dict(size=20))
-    
+    fig8_hist = cached_figure(('utsava_bins', file_path), lambda: bar_figure(
+        binned_df['Bin'], binned_df['Frequency'],
+        'Grouping',
+        x_label='Upasthiti', y_label='Utsava Sankhye',
+        color_scale='Oranges', height=400, text_size=20, left_margin=100,
+        template='streamlit'))
+
     # Plot 5: Pie Chart for Nagara Aggregate Count
     nagara_count = df8['Nagara'].value_counts().reset_index()
     nagara_count.columns = ['Nagara', 'Count']
-    fig8_pie = px.pie(nagara_count,
-                      values='Count',
-                      names='Nagara',
-                      title='Total Utsava',
-                      color_discrete_sequence=px.colors.qualitative.Set3)
-    fig8_pie.update_traces(textinfo='label+value', textfont_size=14)
-    fig8_pie.update_layout(height=400, showlegend=True)
+    fig8_pie = cached_figure(('utsava_pie', file_path), lambda: pie_figure(
+        nagara_count['Count'], nagara_count['Nagara'],
+        'Total Utsava',
+        height=400, text_size=14, colors=px.colors.qualitative.Set3,
+        template='streamlit'))
 
     # # Interactive Selection: Select Nagara and show Vasati details
     # unique_nagara = sorted(df8['Nagara'].unique())
@@ -173,35 +117,16 @@ with tab8:
         st.dataframe(df8)
 
 with tab3:
-    df3 = sheets['Sheet3']
-    # df3 = df3.dropna()
-    # Clean: Remove first row (header) and strip strings
-    df3 = df3.iloc[:].reset_index(drop=True)
-    df3['Nagara'] = df3['Nagara'].str.strip()
-
-    # Ensure 'Grand Total' column is numeric (handle any non-numeric)
-    df3['Grand Total'] = pd.to_numeric(df3['Grand Total'], errors='coerce').fillna(0)
-
-    # Sort in ascending order by Grand Total
-    df3 = df3.sort_values('Grand Total', ascending=True).reset_index(drop=True)
+    # Shared read-only view, sorted in ascending order by Grand Total
+    # (Nagara stripping and numeric Grand Total are done once in shared_data.clean_sheet)
+    df3 = shared_view(file_path, 'Sheet3', sort_by='Grand Total', ascending=True)
 
     # Plot: Interactive bar chart with Plotly
-    fig3 = px.bar(df3,
-                  x='Nagara',
-                  y='Grand Total',
-                  title='Grand Total per Nagara (Patha Sanchalana)',
-                  labels={'Nagara': 'Nagara', 'Grand Total': 'Grand Total'},
-                  color='Grand Total',
-                  color_continuous_scale='Viridis')
-
-    # Increase y-axis by 5% padding
-    y_max3 = df3['Grand Total'].max()
-    y_padding3 = y_max3 * 0.25
-    fig3.update_layout(yaxis=dict(range=[0, y_max3 + y_padding3]), height=800, showlegend=False)
-    # Customize x-axis: Increase font size and make bold (for consistency)
-    fig3.update_xaxes(tickfont=dict(size=14, family="Arial Black, sans-serif"))
-    # Add total count on each bar with increased font size
-    fig3.update_traces(texttemplate='%{y}', textposition='outside', textfont=dict(size=16))
+    fig3 = cached_figure(('sanchalana_summary', file_path), lambda: bar_figure(
+        df3['Nagara'], df3['Grand Total'],
+        'Grand Total per Nagara (Patha Sanchalana)',
+        x_label='Nagara', y_label='Grand Total',
+        color_scale='Viridis', height=800, template='streamlit'))
 
 
     # Sub-tabs for plot and table
@@ -214,6 +139,14 @@ with tab3:
         st.subheader('Patha Sanchalana')
         st.dataframe(df3)
 
+with tab_quality:
+    # Violations found when the workbook was loaded (computed once per process)
+    render_validation_panel(shared_validation(file_path)['report'])
+
+# Memory usage of the dashboard host (budget, per-cache usage, spilled frames)
+with st.sidebar.expander('Memory'):
+    render_memory_panel()
+
 # Footer
 st.markdown('---')
 
@@ -4,11 +4,11 @@ import seaborn as sns
 import numpy as np
 
 
-def create_matplotlib_dashboard(file_path):
+def create_matplotlib_dashboard(file_path, sheets=None, output_prefix='vijayadashami_matplotlib_dashboard', show=True):
     """Create a static dashboard using Matplotlib and Seaborn"""
 
-    # Read data
-    excel_data = pd.read_excel(file_path, sheet_name=None, engine='openpyxl')
+    # Read data (unless the sheets were already loaded, e.g. by build.py)
+    excel_data = sheets if sheets is not None else pd.read_excel(file_path, sheet_name=None, engine='openpyxl')
     df_summary = excel_data['Sheet3'].dropna(how='all')
     df_detailed = excel_data['Sheet8'].dropna(how='all')
     df_summary.columns = df_summary.columns.str.strip()
@@ -92,11 +92,14 @@ def create_matplotlib_dashboard(file_path):
     plt.suptitle('Vijayadashami 2025 - Comprehensive Dashboard', fontsize=16, fontweight='bold', y=1.02)
 
     # Save the dashboard
-    plt.savefig('vijayadashami_matplotlib_dashboard.png', dpi=300, bbox_inches='tight')
-    plt.savefig('vijayadashami_matplotlib_dashboard.pdf', bbox_inches='tight')
+    plt.savefig(f'{output_prefix}.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'{output_prefix}.pdf', bbox_inches='tight')
 
     print("✅ Matplotlib Dashboard saved as PNG and PDF")
-    plt.show()
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
 
 
 # Main execution
@@ -0,0 +1,142 @@
+# Consolidated export of the cleaned and aggregated results
+#
+# Writes one workbook with summary sheets (Nagara summary, Vasati ranking,
+# Utsava rollup) and one sheet per Nagara. The workbook is written with
+# xlsxwriter in constant_memory mode: rows are streamed to disk one at a
+# time, converted to Python values one chunk of rows at a time, so neither
+# the workbook nor a per-cell openpyxl object model is held in memory.
+# Optionally the same tables are written as a CSV or Parquet bundle.
+import os
+import re
+import sys
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import xlsxwriter
+
+from shared_data import DERIVED_COLUMNS, read_sheets
+
+# Rows converted to Python values per chunk while streaming
+BATCH_ROWS = 10000
+
+
+def with_derived_columns(df):
+    """Add every derived column (rates, bins) whose inputs are present"""
+    derived = {}
+    for column, (required, func) in DERIVED_COLUMNS.items():
+        if all(col in df.columns for col in required):
+            derived[column] = func(df)
+    if 'Bin' in derived:
+        derived['Bin'] = derived['Bin'].astype(str)
+    return df.assign(**derived)
+
+
+def results_tables(sheets):
+    """Build the summary tables (name -> DataFrame) written by the export"""
+    # The Grand Total bins are per-Vasati ranges, so they are left off the Nagara totals
+    df_summary = with_derived_columns(sheets['Sheet3']).drop(columns='Bin')
+    df_detailed = with_derived_columns(sheets['Sheet8'])
+
+    # Vasati ranking across the whole Bhaga
+    ranking = df_detailed.sort_values('Grand Total', ascending=False).reset_index(drop=True)
+    ranking.insert(0, 'Rank', ranking['Grand Total'].rank(method='min', ascending=False).astype(int))
+
+    # Utsava rollup per Nagara (Sheet8 summed by Nagara)
+    numeric = df_detailed.select_dtypes('number').columns.drop('Representation_Rate', errors='ignore')
+    rollup = df_detailed.groupby('Nagara')[list(numeric)].sum().reset_index()
+    rollup.insert(1, 'Vasatis', df_detailed.groupby('Nagara').size().reindex(rollup['Nagara']).to_numpy())
+    rollup = with_derived_columns(rollup).drop(columns='Bin')
+    rollup = rollup.sort_values('Grand Total', ascending=False).reset_index(drop=True)
+
+    return {
+        'Nagara Summary': df_summary,
+        'Vasati Ranking': ranking,
+        'Utsava Rollup': rollup,
+    }, df_detailed
+
+
+def sheet_name(name, used):
+    """Excel-safe, unique worksheet name (max 31 chars, no []:*?/\\)"""
+    base = re.sub(r'[\[\]:*?/\\]', '_', str(name)).strip()[:31] or 'Sheet'
+    candidate, i = base, 2
+    while candidate.lower() in used:
+        suffix = f' ({i})'
+        candidate = base[:31 - len(suffix)] + suffix
+        i += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def stream_rows(worksheet, df, header_format):
+    """Write a DataFrame to a constant_memory worksheet, row by row in order"""
+    worksheet.write_row(0, 0, list(df.columns), header_format)
+    row = 1
+    for start in range(0, len(df), BATCH_ROWS):
+        # Only one chunk is converted at a time; missing values become blank cells
+        chunk = df.iloc[start:start + BATCH_ROWS]
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for values in chunk.itertuples(index=False, name=None):
+            worksheet.write_row(row, 0, values)
+            row += 1
+    worksheet.freeze_panes(1, 0)
+    worksheet.set_column(0, len(df.columns) - 1, 14)
+
+
+def export_workbook(sheets, output_path):
+    """Write the consolidated results workbook in constant-memory mode"""
+    tables, df_detailed = results_tables(sheets)
+
+    workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True, 'nan_inf_to_errors': True})
+    header_format = workbook.add_format({'bold': True, 'bg_color': '#4CAF50', 'font_color': 'white'})
+    used = set()
+
+    for name, df in tables.items():
+        stream_rows(workbook.add_worksheet(sheet_name(name, used)), df, header_format)
+
+    # One sheet per Nagara, Vasatis ranked by Grand Total
+    for nagara, df_nagara in df_detailed.groupby('Nagara', sort=True):
+        df_nagara = df_nagara.sort_values('Grand Total', ascending=False)
+        stream_rows(workbook.add_worksheet(sheet_name(nagara, used)), df_nagara, header_format)
+
+    workbook.close()
+    return list(tables)
+
+
+def export_bundle(sheets, output_dir, file_format='csv'):
+    """Write the summary tables and the cleaned sheets as a CSV or Parquet bundle"""
+    tables, df_detailed = results_tables(sheets)
+    tables['Utsava'] = df_detailed
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for name, df in tables.items():
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        path = os.path.join(output_dir, name.lower().replace(' ', '_') + '.' + file_format)
+        if file_format == 'parquet':
+            pq.write_table(table, path)
+        else:
+            pa_csv.write_csv(table, path)
+        paths.append(path)
+    return paths
+
+
+# Main execution
+if __name__ == "__main__":
+    # Usage: python export_results.py [workbook] [--bundle csv|parquet]
+    args = sys.argv[1:]
+    bundle_format = None
+    if '--bundle' in args:
+        i = args.index('--bundle')
+        bundle_format = args[i + 1] if i + 1 < len(args) else 'csv'
+        del args[i:i + 2]
+    file_path = args[0] if args else "Vijayadashami_VIJ_2025.xlsx"
+
+    sheets = read_sheets(file_path)
+
+    export_workbook(sheets, "vijayadashami_results.xlsx")
+    print("✅ Consolidated results saved as 'vijayadashami_results.xlsx'")
+
+    if bundle_format:
+        paths = export_bundle(sheets, "vijayadashami_results", bundle_format)
+        print(f"✅ {len(paths)} {bundle_format.upper()} files saved in 'vijayadashami_results/'")
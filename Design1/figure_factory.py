@@ -0,0 +1,198 @@
+# Template-based figure builder for the dashboard bar and pie charts
+#
+# Every chart used to go through px.bar / px.pie followed by several
+# update_layout / update_xaxes / update_traces calls, each of which walks and
+# validates the whole figure. Here the styled figure (Arial Black tick fonts,
+# 25% y-padding, outside text labels, resolved colour scale, default plotly
+# template) is built once per style as a plain dict, and each chart only fills
+# in its data arrays. Nothing is validated: use figure_json() to serialise
+# straight to JSON, or to_figure() when a go.Figure is needed.
+#
+# The plotly template is always named explicitly: importing Streamlit switches
+# plotly's default to the 'streamlit' template, whose colours are placeholders
+# only Streamlit's frontend fills in. Figures written to disk use 'plotly'.
+#
+# The figure dicts share the cached template dicts. Serialising them is safe
+# from any thread, but plotly's validation briefly mutates the dicts it is
+# given, so hand plotly (st.plotly_chart, go.Figure) a copy when figures are
+# shared between sessions (memory_budget.cached_figure does this).
+import json
+import sys
+import time
+from functools import lru_cache
+
+import numpy as np
+import plotly.colors
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+TICK_FONT = {'size': 14, 'family': 'Arial Black, sans-serif'}
+
+# Head-room above the tallest bar for the outside text labels
+Y_PADDING = 0.25
+
+# Plotly template for figures used outside Streamlit (files, HTML exports)
+DEFAULT_TEMPLATE = 'plotly'
+
+
+@lru_cache(maxsize=None)
+def plotly_template(name=DEFAULT_TEMPLATE):
+    """A named plotly template as a plain dict (resolved once per name)"""
+    return pio.templates[name].to_plotly_json()
+
+
+@lru_cache(maxsize=None)
+def bar_template(color_scale='Viridis', height=500, text_size=16, left_margin=None,
+                 template=DEFAULT_TEMPLATE):
+    """Build the styled bar layout and trace for one style (cached)"""
+    layout = {
+        'template': plotly_template(template),
+        'height': height,
+        'showlegend': False,
+        'barmode': 'relative',
+        'xaxis': {'anchor': 'y', 'domain': [0.0, 1.0], 'tickfont': TICK_FONT},
+        'coloraxis': {'colorscale': plotly.colors.get_colorscale(color_scale)},
+    }
+    if left_margin is not None:
+        layout['margin'] = {'l': left_margin}
+    trace = {
+        'type': 'bar',
+        'orientation': 'v',
+        'showlegend': False,
+        'texttemplate': '%{y}',
+        'textposition': 'outside',
+        'textfont': {'size': text_size},
+        'xaxis': 'x',
+        'yaxis': 'y',
+    }
+    return layout, trace
+
+
+@lru_cache(maxsize=None)
+def pie_template(height=400, text_size=14, colors=None, template=DEFAULT_TEMPLATE):
+    """Build the styled pie layout and trace for one style (cached)"""
+    layout = {
+        'template': plotly_template(template),
+        'height': height,
+        'showlegend': True,
+        'legend': {'tracegroupgap': 0},
+    }
+    trace = {
+        'type': 'pie',
+        'textinfo': 'label+value',
+        'textfont': {'size': text_size},
+        'domain': {'x': [0.0, 1.0], 'y': [0.0, 1.0]},
+    }
+    if colors is not None:
+        layout['piecolorway'] = list(colors)
+    return layout, trace
+
+
+def as_list(values):
+    """Plain Python list of a Series/array (JSON-serialisable, no validation needed)"""
+    return np.asarray(values).tolist()
+
+
+def bar_figure(x, y, title, x_label='', y_label='', color_scale='Viridis',
+               height=500, text_size=16, left_margin=None, template=DEFAULT_TEMPLATE):
+    """Styled bar chart coloured by y, as a figure dict"""
+    layout, trace = bar_template(color_scale, height, text_size, left_margin, template)
+    y = as_list(y)
+    y_max = max(y) if y else 0
+    return {
+        'data': [dict(trace, x=as_list(x), y=y, marker={'color': y, 'coloraxis': 'coloraxis'},
+                      hovertemplate=f'{x_label}=%{{x}}<br>{y_label}=%{{y}}<extra></extra>')],
+        'layout': dict(layout,
+                       title={'text': title},
+                       xaxis=dict(layout['xaxis'], title={'text': x_label}),
+                       yaxis={'anchor': 'x', 'domain': [0.0, 1.0], 'title': {'text': y_label},
+                              'range': [0, y_max + y_max * Y_PADDING]},
+                       coloraxis=dict(layout['coloraxis'], colorbar={'title': {'text': y_label}})),
+    }
+
+
+def pie_figure(values, names, title, height=400, text_size=14, colors=None, template=DEFAULT_TEMPLATE):
+    """Styled pie chart with label+value text, as a figure dict"""
+    layout, trace = pie_template(height, text_size, None if colors is None else tuple(colors), template)
+    return {
+        'data': [dict(trace, values=as_list(values), labels=as_list(names))],
+        'layout': dict(layout, title={'text': title}),
+    }
+
+
+def to_figure(figure):
+    """Wrap a figure dict in a go.Figure without re-validating it"""
+    return go.Figure(figure, _validate=False)
+
+
+def figure_json(figure):
+    """Serialise a figure dict to JSON (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(figure).decode('utf-8')
+    return json.dumps(figure, separators=(',', ':'))
+
+
+def nagara_figures(df8, template=DEFAULT_TEMPLATE):
+    """Batch output: one 'Grand Total per Vasati' figure dict per Nagara"""
+    figures = {}
+    for nagara, df_selected in df8.groupby('Nagara', sort=True):
+        figures[nagara] = bar_figure(df_selected['Vasati'], df_selected['Grand Total'],
+                                     f'Grand Total per Vasati in {nagara}',
+                                     x_label='Vasati', y_label='Total', color_scale='Greens',
+                                     template=template)
+    return figures
+
+
+def px_nagara_figure(df_selected, nagara):
+    """The px.bar + update_* path design3.py used, for benchmarking"""
+    fig = px.bar(df_selected, x='Vasati', y='Grand Total',
+                 title=f'Grand Total per Vasati in {nagara}',
+                 labels={'Vasati': 'Vasati', 'Grand Total': 'Total'},
+                 color='Grand Total', color_continuous_scale='Greens',
+                 template=DEFAULT_TEMPLATE)
+    y_max = df_selected['Grand Total'].max()
+    fig.update_layout(yaxis=dict(range=[0, y_max + y_max * Y_PADDING]), height=500, showlegend=False)
+    fig.update_xaxes(tickfont=TICK_FONT)
+    fig.update_traces(texttemplate='%{y}', textposition='outside', textfont=dict(size=16))
+    return fig
+
+
+def benchmark(df8, count=1000):
+    """Time building and serialising `count` per-Nagara figures with px vs the factory"""
+    groups = [(nagara, df.reset_index(drop=True)) for nagara, df in df8.groupby('Nagara', sort=True)]
+    jobs = [groups[i % len(groups)] for i in range(count)]
+
+    start = time.perf_counter()
+    for nagara, df_selected in jobs:
+        px_nagara_figure(df_selected, nagara).to_json()
+    px_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for nagara, df_selected in jobs:
+        figure_json(bar_figure(df_selected['Vasati'], df_selected['Grand Total'],
+                               f'Grand Total per Vasati in {nagara}',
+                               x_label='Vasati', y_label='Total', color_scale='Greens'))
+    factory_seconds = time.perf_counter() - start
+
+    return px_seconds, factory_seconds
+
+
+# Main execution
+if __name__ == "__main__":
+    from shared_data import read_sheets
+
+    file_path = sys.argv[1] if len(sys.argv) > 1 else "Vijayadashami_VIJ_2025.xlsx"
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    df8 = read_sheets(file_path)['Sheet8']
+    px_seconds, factory_seconds = benchmark(df8, count)
+
+    print(f"px.bar + update_*   : {px_seconds:.2f}s for {count} figures ({px_seconds / count * 1000:.2f} ms each)")
+    print(f"figure_factory      : {factory_seconds:.2f}s for {count} figures ({factory_seconds / count * 1000:.2f} ms each)")
+    print(f"✅ Speed-up: {px_seconds / factory_seconds:.1f}x")
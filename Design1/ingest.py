@@ -0,0 +1,275 @@
+# Native ingestion of the form exports (CSV / JSON / Parquet) via Arrow
+#
+# Field data arrives as CSV or JSON exports from the online forms. Instead of
+# pasting them into the workbook so pd.read_excel (openpyxl, one Python object
+# per cell) can read them, a directory of exports is read directly with
+# Arrow's multithreaded readers and mapped onto the Sheet3/Sheet8 schema.
+# shared_data.read_sheets() accepts such a directory wherever a workbook path
+# is accepted, and applies the same cleaning and name normalisation.
+#
+# Expected layout (one file per sheet, first match wins):
+#   <dir>/Sheet3.{parquet,csv,json}  or  <dir>/patha_sanchalana.{parquet,csv,json}
+#   <dir>/Sheet8.{parquet,csv,json}  or  <dir>/utsava.{parquet,csv,json}
+# Headers are matched to the schema ignoring case, spaces and underscores.
+# JSON may be newline-delimited (read in parallel) or a single array of records;
+# records may leave out empty fields, columns are the union of all keys.
+# Form exports often quote numbers ("12") and write blanks as "", which the
+# Arrow JSON reader rejects when a column mixes them with plain numbers: such
+# files (and arrays of records) are parsed with json instead. Whatever the
+# format, blank values become missing and counts are converted to numbers,
+# as read_excel gives them for the workbook.
+#
+# Usage (throughput comparison against the xlsx path):
+#   python ingest.py [workbook] [--rows N] [--repeat N]
+import json
+import math
+import os
+import re
+import sys
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.json as pa_json
+import pyarrow.parquet as pq
+
+# Columns of each sheet, in workbook order
+SHEET_COLUMNS = {
+    'Sheet3': ['Sl No', 'Nagara', 'Total Vasati', 'Represented Vasati', 'Total Booths',
+               'Represented Booths', 'Taruna-C', 'balaka-C', 'Total-C', 'Taruna-P',
+               'balaka-P', 'Total-P', 'Grand Total', 'Ghosh'],
+    'Sheet8': ['Nagara', 'Grade', 'Vasati', 'Total Booths', 'Represented Booths', 'Shakha',
+               'Represented Shakha', 'Milan', 'Represented Milan', 'Tarun', 'Balak', 'Total',
+               'Shishu', 'Rest', 'Women', 'Grand Total'],
+}
+
+# File names (without extension) an export of each sheet may have
+SHEET_FILES = {
+    'Sheet3': ['Sheet3', 'patha_sanchalana'],
+    'Sheet8': ['Sheet8', 'utsava'],
+}
+
+# Columns holding text; every other schema column is a number
+TEXT_COLUMNS = ['Nagara', 'Grade', 'Vasati']
+
+# Preferred first: Parquet is typed and columnar, JSON is the slowest to parse
+EXPORT_FORMATS = ['parquet', 'csv', 'json']
+
+
+def column_key(name):
+    """Header folded for matching: case, spaces and underscores ignored"""
+    return re.sub(r'[\s_]+', ' ', str(name)).strip().lower()
+
+
+def export_path(folder, sheet_name):
+    """The export file for one sheet in `folder` (None if there is none)"""
+    for stem in SHEET_FILES[sheet_name]:
+        for file_format in EXPORT_FORMATS:
+            path = os.path.join(folder, f"{stem}.{file_format}")
+            if os.path.exists(path):
+                return path
+    return None
+
+
+def read_json_frame(path):
+    """Read a JSON export: newline-delimited with the parallel reader where it can, else with json"""
+    with open(path, 'rb') as f:
+        first = f.read(1024).lstrip()[:1]
+    if first != b'[':
+        try:
+            return pa_json.read_json(path, read_options=pa_json.ReadOptions(use_threads=True)).to_pandas()
+        except pa.ArrowInvalid:
+            # A column mixing numbers with quoted numbers or "" (see above)
+            pass
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    if first != b'[':
+        # One parse of all lines as an array is much faster than a json.loads per line
+        text = '[' + ','.join(line for line in text.splitlines() if line.strip()) + ']'
+    records = json.loads(text)
+    # Columns are the union of all keys (from_pylist would use the first record's only)
+    return pd.DataFrame.from_records(records)
+
+
+def read_export_file(path):
+    """Read one export file into a DataFrame with the multithreaded Arrow readers"""
+    file_format = os.path.splitext(path)[1].lower().lstrip('.')
+    if file_format == 'parquet':
+        return pq.read_table(path, use_threads=True).to_pandas()
+    if file_format == 'json':
+        return read_json_frame(path)
+    # Blank cells become nulls, as they do with read_excel
+    return pa_csv.read_csv(path,
+                           read_options=pa_csv.ReadOptions(use_threads=True),
+                           convert_options=pa_csv.ConvertOptions(strings_can_be_null=True)).to_pandas()
+
+
+def map_to_schema(df, sheet_name, path):
+    """Rename export headers to the sheet's columns; schema columns first, extras kept"""
+    canonical = {column_key(column): column for column in SHEET_COLUMNS[sheet_name]}
+    headers = {}  # column -> export header
+    for name in df.columns:
+        column = canonical.get(column_key(name), name)
+        if column in headers:
+            raise ValueError(f"Headers '{headers[column]}' and '{name}' in '{path}' "
+                             f"both map to the {sheet_name} column '{column}'")
+        headers[column] = name
+    df = df.set_axis(list(headers), axis=1)
+
+    extras = [column for column in headers if column not in SHEET_COLUMNS[sheet_name]]
+    return df.reindex(columns=SHEET_COLUMNS[sheet_name] + extras)
+
+
+def coerce_values(df, sheet_name):
+    """Blank values as missing and counts as numbers, as read_excel returns them"""
+    for column in SHEET_COLUMNS[sheet_name]:
+        values = df[column]
+        if pd.api.types.is_numeric_dtype(values):
+            continue
+        if column in TEXT_COLUMNS:
+            df[column] = values.where(values.astype(str).str.strip() != '')
+        else:
+            # "" and values that are not numbers become missing
+            df[column] = pd.to_numeric(values, errors='coerce')
+    return df
+
+
+def read_exports(folder):
+    """Read Sheet3 and Sheet8 from a directory of exports into raw DataFrames (uncleaned)"""
+    sheets = {}
+    for sheet_name in SHEET_COLUMNS:
+        path = export_path(folder, sheet_name)
+        if path is None:
+            names = ', '.join(f"{stem}.{{{','.join(EXPORT_FORMATS)}}}" for stem in SHEET_FILES[sheet_name])
+            raise FileNotFoundError(f"No export for {sheet_name} in '{folder}' (expected {names})")
+        sheets[sheet_name] = coerce_values(map_to_schema(read_export_file(path), sheet_name, path), sheet_name)
+    return sheets
+
+
+def write_exports(sheets, folder, file_format):
+    """Write raw sheets as one export file per sheet (CSV, newline-delimited JSON or Parquet)"""
+    os.makedirs(folder, exist_ok=True)
+    for sheet_name, df in sheets.items():
+        path = os.path.join(folder, f"{sheet_name}.{file_format}")
+        if file_format == 'json':
+            df.to_json(path, orient='records', lines=True, force_ascii=False)
+            continue
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if file_format == 'parquet':
+            pq.write_table(table, path)
+        else:
+            pa_csv.write_csv(table, path)
+
+
+def write_form_json(sheets, folder, lines):
+    """Write raw sheets as JSON the way online forms export them
+
+    Numbers are quoted on every other record and blanks are written as "".
+    With `lines` the records are newline-delimited, else one array.
+    """
+    os.makedirs(folder, exist_ok=True)
+    for sheet_name, df in sheets.items():
+        records = df.to_dict('records')
+        for i, record in enumerate(records):
+            for key, value in record.items():
+                if pd.isna(value):
+                    record[key] = ''
+                elif i % 2 and not isinstance(value, str):
+                    record[key] = str(value)
+        with open(os.path.join(folder, f"{sheet_name}.json"), 'w', encoding='utf-8') as f:
+            if lines:
+                f.writelines(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+            else:
+                json.dump(records, f, ensure_ascii=False)
+
+
+def same_data(sheets, expected):
+    """Whether two sets of cleaned sheets hold the same values (dtypes may differ)"""
+    try:
+        for sheet_name, df in expected.items():
+            pd.testing.assert_frame_equal(sheets[sheet_name], df, check_dtype=False)
+    except AssertionError:
+        return False
+    return True
+
+
+def best_time(read, repeat):
+    """Fastest of `repeat` timed reads, with the last result"""
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = read()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def benchmark(file_path, rows=None, repeat=3):
+    """Time read_sheets on the workbook vs the same data as CSV/JSON/Parquet exports
+
+    The sheets are written to a scratch workbook with a few counts left blank,
+    as form exports have them. With `rows`, they are repeated to about that
+    many Sheet8 rows first so the comparison is not dominated by fixed costs
+    on the small real workbook. Besides the plain exports, the data is also
+    read from form-style JSON (quoted numbers, "" for blanks), newline-delimited
+    and as an array.
+    """
+    from shared_data import SHEET_NAMES, read_sheets
+
+    raw = pd.read_excel(file_path, sheet_name=SHEET_NAMES, engine='openpyxl')
+    if rows:
+        factor = max(1, math.ceil(rows / len(raw['Sheet8'])))
+        raw = {name: pd.concat([df] * factor, ignore_index=True) for name, df in raw.items()}
+    for df in raw.values():
+        for column in ['Grand Total', 'Total Booths']:
+            df[column] = df[column].mask(df.index % 7 == 3)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workbook = os.path.join(tmp, 'workbook.xlsx')
+        with pd.ExcelWriter(workbook, engine='xlsxwriter') as writer:
+            for name, df in raw.items():
+                df.to_excel(writer, sheet_name=name, index=False)
+
+        xlsx_seconds, expected = best_time(lambda: read_sheets(workbook, normalise=False), repeat)
+        sources = [('xlsx', workbook)]
+        for file_format in EXPORT_FORMATS:
+            write_exports(raw, os.path.join(tmp, file_format), file_format)
+            sources.append((file_format, os.path.join(tmp, file_format)))
+        for name, lines in [('json form lines', True), ('json form array', False)]:
+            write_form_json(raw, os.path.join(tmp, name), lines)
+            sources.append((name, os.path.join(tmp, name)))
+
+        for file_format, path in sources:
+            if file_format == 'xlsx':
+                seconds, sheets = xlsx_seconds, expected
+            else:
+                seconds, sheets = best_time(lambda: read_sheets(path, normalise=False), repeat)
+            row_count = sum(len(df) for df in sheets.values())
+            results.append({
+                'Format': file_format,
+                'Rows': row_count,
+                'Seconds': round(seconds, 4),
+                'Rows/s': round(row_count / seconds),
+                'Speed-up vs xlsx': round(xlsx_seconds / seconds, 1),
+                'Same data as xlsx': same_data(sheets, expected),
+            })
+    return pd.DataFrame(results)
+
+
+# Main execution
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {'--rows': None, '--repeat': '3'}
+    for flag in options:
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            del args[i:i + 2]
+    file_path = args[0] if args else "Vijayadashami_VIJ_2025.xlsx"
+
+    rows = int(options['--rows']) if options['--rows'] else None
+    report = benchmark(file_path, rows, int(options['--repeat']))
+    print(report.to_string(index=False))
+    print(f"✅ Fastest export format: {report.iloc[report['Seconds'].idxmin()]['Format']}")
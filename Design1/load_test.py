@@ -0,0 +1,293 @@
+# Concurrent-session load test for the Streamlit dashboards
+#
+# Starts the app with `streamlit run --server.headless` and connects N
+# concurrent sessions to it over the websocket protocol the browser uses
+# (/_stcore/stream, protobuf BackMsg/ForwardMsg), so the server runs each
+# session as its own script thread against the shared process caches, exactly
+# as in production. Each session does a first load and then random but
+# realistic interactions with the widgets the server sent it: view radio
+# switches, Nagara selectbox changes and top_n slider moves, each sent as a
+# rerun with the session's widget states. (st.tabs switches happen in the
+# browser and never trigger a rerun.)
+#
+# A rerun counts as an error when the app raised an exception, the run did not
+# finish successfully, nothing was rendered, or the connection failed or timed
+# out; a session that crashes counts its remaining reruns as errors.
+#
+# The run starts with a cold phase: several sessions open their first page at
+# once on the freshly started server, so they all miss the empty caches
+# together (the path where concurrent sessions race to build the same data).
+# It also warms the imports and shared caches, so they are not counted as
+# per-session memory in the warm levels that follow.
+#
+# For every concurrency level it records p50/p95/p99 rerun latency,
+# throughput and server memory per session, and writes the scaling curve to a
+# CSV that can be compared between versions.
+#
+# Usage:
+#   python load_test.py [design3.py|design2.py] [--sessions 1,5,10,25,50]
+#                       [--steps 10] [--think 0.5] [--cold 5] [--label NAME]
+#   python load_test.py --compare old.csv new.csv
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.sync.client import connect
+
+from memory_budget import MB, current_rss
+
+DESIGN_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(DESIGN_DIR)
+
+# App -> (working directory its file paths are relative to, script path)
+APPS = {
+    'design2.py': (DESIGN_DIR, os.path.join(DESIGN_DIR, 'design2.py')),
+    'design3.py': (REPO_DIR, os.path.join(DESIGN_DIR, 'design3.py')),
+}
+
+RERUN_TIMEOUT = 120
+STARTUP_TIMEOUT = 60
+
+# Widgets a simulated viewer interacts with
+WIDGET_TYPES = ('radio', 'selectbox', 'slider')
+
+
+def free_port():
+    """An unused local TCP port for the server"""
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app, port):
+    """Start `streamlit run` headless for the app and wait until it is healthy"""
+    cwd, script = APPS[app]
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', script,
+         '--server.headless', 'true', '--server.port', str(port),
+         '--server.fileWatcherType', 'none', '--browser.gatherUsageStats', 'false'],
+        cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"streamlit exited with code {server.returncode} while starting {app}")
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"streamlit did not become healthy within {STARTUP_TIMEOUT}s")
+
+
+class Session:
+    """One browser session: a websocket connection plus the widget values it has set"""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.widgets = []  # (type, proto) of the widgets rendered by the last run
+        self.states = {}   # widget id -> WidgetState sent with every rerun
+
+    def rerun(self):
+        """Rerun the script with the current widget states; return whether it succeeded"""
+        message = BackMsg()
+        message.rerun_script.query_string = ''
+        message.rerun_script.widget_states.widgets.extend(self.states.values())
+        self.websocket.send(message.SerializeToString())
+
+        widgets, elements, failed = [], 0, False
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(self.websocket.recv(timeout=RERUN_TIMEOUT))
+            kind = forward.WhichOneof('type')
+            if kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+                element = forward.delta.new_element
+                element_type = element.WhichOneof('type')
+                elements += 1
+                if element_type == 'exception':
+                    failed = True
+                elif element_type in WIDGET_TYPES:
+                    widgets.append((element_type, getattr(element, element_type)))
+            elif kind == 'script_finished':
+                status = forward.script_finished
+                break
+
+        self.widgets = widgets
+        return not failed and elements > 0 and status == ForwardMsg.FINISHED_SUCCESSFULLY
+
+    def interact(self, rng):
+        """Change one widget the way a viewer would, then rerun; return (kind, succeeded)"""
+        if not self.widgets:
+            return 'rerun', self.rerun()
+
+        kind, proto = rng.choice(self.widgets)
+        state = WidgetState(id=proto.id)
+        if kind == 'slider':
+            low, high = proto.min, proto.max
+            value = rng.randint(int(low), int(high)) if proto.data_type == proto.INT else rng.uniform(low, high)
+            state.double_array_value.data[:] = [value]
+        else:
+            state.string_value = rng.choice(list(proto.options))
+        self.states[proto.id] = state
+        return kind, self.rerun()
+
+
+def run_session(url, steps, think, seed, start, done, results):
+    """One simulated viewer: first load plus `steps` interactions"""
+    rng = random.Random(seed)
+    start.wait()
+    remaining, measured = steps + 1, False
+    try:
+        began = time.perf_counter()
+        with connect(url, subprotocols=['streamlit'], max_size=None, open_timeout=RERUN_TIMEOUT) as websocket:
+            session = Session(websocket)
+            succeeded = session.rerun()
+            results.append(('load', time.perf_counter() - began, not succeeded))
+            remaining -= 1
+
+            for _ in range(steps):
+                if think:
+                    time.sleep(rng.uniform(0, think))
+                began = time.perf_counter()
+                kind, succeeded = session.interact(rng)
+                results.append((kind, time.perf_counter() - began, not succeeded))
+                remaining -= 1
+
+            # Keep the session open until the server's memory has been measured
+            measured = True
+            done.wait()
+    except Exception as error:
+        # Connection failures, timeouts and protocol errors: the rest of this session fails
+        print(f"session {seed} failed: {type(error).__name__}: {error}")
+        results.extend([('failed', np.nan, True)] * remaining)
+    finally:
+        if not measured:
+            done.wait()
+
+
+def run_level(url, server_pid, count, steps, think):
+    """Run `count` concurrent sessions against the server and summarise their reruns"""
+    results = []
+    start, done = threading.Barrier(count + 1), threading.Barrier(count + 1)
+    baseline = current_rss(server_pid)
+    threads = [threading.Thread(target=run_session,
+                                args=(url, steps, think, seed, start, done, results))
+               for seed in range(count)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    while len(results) < count * (steps + 1):
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - began
+
+    # Measure while the sessions (and their state on the server) are still alive
+    rss = current_rss(server_pid)
+    done.wait()
+    for thread in threads:
+        thread.join()
+
+    reruns = pd.DataFrame(results, columns=['Kind', 'Seconds', 'Error'])
+    timed = reruns.dropna(subset=['Seconds'])
+    loads = timed[timed['Kind'] == 'load']['Seconds'] * 1000
+    interactions = timed[timed['Kind'] != 'load']['Seconds'] * 1000
+    latencies = interactions if len(interactions) else loads
+
+    def percentile(values, q):
+        return round(float(np.percentile(values, q)), 1) if len(values) else np.nan
+
+    return {
+        'Sessions': count,
+        'Reruns': len(reruns),
+        'Errors': int(reruns['Error'].sum()),
+        'First load p50 (ms)': percentile(loads, 50),
+        'p50 (ms)': percentile(latencies, 50),
+        'p95 (ms)': percentile(latencies, 95),
+        'p99 (ms)': percentile(latencies, 99),
+        'Throughput (reruns/s)': round(len(timed) / elapsed, 2),
+        'Server RSS (MB)': round(rss / MB, 1),
+        'Memory per session (MB)': round(max(rss - baseline, 0) / MB / count, 2),
+    }
+
+
+def current_label():
+    """Version label for the report: the current git commit, if there is one"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'current'
+
+
+def compare(old_path, new_path):
+    """Side-by-side scaling curves of two reports"""
+    old, new = pd.read_csv(old_path), pd.read_csv(new_path)
+    keys = ['Phase', 'Sessions']
+    columns = ['p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'Throughput (reruns/s)', 'Memory per session (MB)']
+    merged = old[keys + columns].merge(new[keys + columns], on=keys, suffixes=(' old', ' new'))
+    for column in columns:
+        merged[f'{column} change %'] = ((merged[f'{column} new'] / merged[f'{column} old'] - 1) * 100).round(1)
+    return merged
+
+
+# Main execution
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    if args and args[0] == '--compare':
+        print(compare(args[1], args[2]).to_string(index=False))
+        sys.exit(0)
+
+    options = {'--sessions': '1,5,10,25,50', '--steps': '10', '--think': '0', '--cold': '5',
+               '--label': None}
+    for flag in options:
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            del args[i:i + 2]
+    app = args[0] if args else 'design3.py'
+    if app not in APPS:
+        print(f"Unknown app {app} (available: {', '.join(APPS)})")
+        sys.exit(1)
+
+    levels = [int(n) for n in options['--sessions'].split(',')]
+    steps, think, cold = int(options['--steps']), float(options['--think']), int(options['--cold'])
+    label = options['--label'] or current_label()
+
+    port = free_port()
+    server = start_server(app, port)
+    url = f"ws://localhost:{port}/_stcore/stream"
+    rows = []
+    try:
+        # Concurrent first loads on empty caches (this also warms them for the levels below)
+        row = dict(Phase='cold', **run_level(url, server.pid, cold, 0, 0))
+        rows.append(row)
+        print(f"cold start, {cold} sessions: first load p50 {row['First load p50 (ms)']:8.1f} ms  "
+              f"{row['Errors']} errors")
+
+        for count in levels:
+            row = dict(Phase='warm', **run_level(url, server.pid, count, steps, think))
+            rows.append(row)
+            print(f"{count:4d} sessions: p50 {row['p50 (ms)']:8.1f} ms  p95 {row['p95 (ms)']:8.1f} ms  "
+                  f"p99 {row['p99 (ms)']:8.1f} ms  {row['Throughput (reruns/s)']:6.2f} reruns/s  "
+                  f"{row['Memory per session (MB)']:6.2f} MB/session  {row['Errors']} errors")
+    finally:
+        server.terminate()
+        server.wait()
+
+    report = pd.DataFrame(rows)
+    output_path = os.path.join(DESIGN_DIR, f"load_test_{os.path.splitext(app)[0]}_{label}.csv")
+    report.to_csv(output_path, index=False)
+    print(f"✅ Scaling curve saved as '{output_path}'")
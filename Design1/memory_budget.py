@@ -0,0 +1,360 @@
+# Memory budget for the dashboard host, with eviction and spill-to-disk
+#
+# The shared data (shared_data: the base Arrow tables, derived columns and
+# views) and the built figures are kept in BudgetedCache instances instead of
+# open-ended st.cache_* caches. After every insert the process RSS is sampled;
+# when it is over the budget, cached figures are evicted first (least recently
+# used), then cold views, then cold derived columns and base tables are
+# spilled to uncompressed Arrow IPC files. A spilled entry is reloaded lazily
+# on its next use through a memory map, so its pages are file-backed and can
+# be reclaimed by the kernel instead of counting against the OOM killer.
+#
+# Entries are sized by the memory blocks they reference, and a release only
+# counts the blocks no other cached entry still references: a view that is
+# zero-copy over a base table owns (and frees) only its overlay columns or
+# sort copy. Releasing stops at a low-water mark below the budget, entries
+# used within the cool-down are never released, and since RSS rarely drops
+# right after objects are freed, a new pass starts only after the cool-down
+# and once RSS has grown past where the previous pass left it.
+#
+# Concurrent sessions that miss the same key do not all build it: the first
+# one builds, the others wait for its result.
+#
+# Configuration (environment variables):
+#   DASHBOARD_MEMORY_BUDGET_MB   RSS budget in MB (default 512)
+#   DASHBOARD_MEMORY_COOL_DOWN   cool-down in seconds (default 10)
+#   DASHBOARD_SPILL_DIR          where spilled entries go (default: temp dir)
+#   DASHBOARD_TRACEMALLOC        set to 1 to also report tracemalloc figures
+import atexit
+import copy
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+MB = 1024 * 1024
+MEMORY_BUDGET = int(float(os.environ.get('DASHBOARD_MEMORY_BUDGET_MB', 512)) * MB)
+COOL_DOWN = float(os.environ.get('DASHBOARD_MEMORY_COOL_DOWN', 10))
+SPILL_DIR = os.environ.get('DASHBOARD_SPILL_DIR',
+                           os.path.join(tempfile.gettempdir(), 'vijayadashami_spill'))
+
+# A pass over the budget releases entries until usage is estimated below this
+LOW_WATER_FRACTION = 0.8
+
+if os.environ.get('DASHBOARD_TRACEMALLOC') == '1' and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+# Recent (timestamp, RSS) samples for the dashboard panel
+RSS_SAMPLES = deque(maxlen=300)
+
+spill_counter = itertools.count()
+
+
+def current_rss(pid=None):
+    """Resident set size of this (or another) process in bytes (0 if it cannot be measured)"""
+    if psutil is not None:
+        return psutil.Process(pid).memory_info().rss
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def sample_rss():
+    """Take one RSS sample and remember it for the panel"""
+    rss = current_rss()
+    RSS_SAMPLES.append((time.time(), rss))
+    return rss
+
+
+def arrow_regions(data, regions):
+    """Add the buffers (address -> bytes) of an Arrow array or chunked array"""
+    for chunk in data.chunks if isinstance(data, pa.ChunkedArray) else [data]:
+        for buf in chunk.buffers():
+            if buf is not None:
+                regions[buf.address] = buf.size
+        if pa.types.is_dictionary(chunk.type):
+            arrow_regions(chunk.dictionary, regions)
+
+
+def numpy_regions(values, regions):
+    """Add the memory block of a numpy array (object arrays: with their Python objects)"""
+    if values.dtype == object:
+        regions[values.__array_interface__['data'][0]] = int(pd.Series(values).memory_usage(deep=True))
+    else:
+        regions[values.__array_interface__['data'][0]] = values.nbytes
+
+
+def memory_regions(value):
+    """Memory blocks (address -> bytes) a cached table, frame or figure references"""
+    regions = {}
+    if isinstance(value, pa.Table):
+        for column in value.columns:
+            arrow_regions(column, regions)
+    elif isinstance(value, pd.DataFrame):
+        for _, column in value.items():
+            array = column.array
+            if isinstance(array, pd.arrays.ArrowExtensionArray):
+                arrow_regions(array.__arrow_array__(), regions)
+            elif isinstance(array, pd.Categorical):
+                numpy_regions(array.codes, regions)
+                numpy_regions(array.categories.to_numpy(), regions)
+            else:
+                numpy_regions(column.to_numpy(copy=False), regions)
+    elif isinstance(value, dict):
+        # Figures are private to their entry
+        regions[id(value)] = len(json.dumps(value, default=str))
+    return regions
+
+
+def arrow_or_categorical(data_type):
+    """types_mapper for reloading spilled frames: keep dictionaries as pandas categoricals"""
+    return None if pa.types.is_dictionary(data_type) else pd.ArrowDtype(data_type)
+
+
+class BudgetedCache:
+    """LRU cache whose entries can be evicted (figures) or spilled to disk (tables, frames)"""
+
+    def __init__(self, name, spillable):
+        self.name = name
+        self.spillable = spillable
+        # key -> {'value', 'regions', 'used', 'path', 'disk'}
+        self.entries = OrderedDict()
+        # key -> Future of a build in progress
+        self.building = {}
+        self.lock = threading.RLock()
+        self.stats = {'hits': 0, 'misses': 0, 'waits': 0, 'evictions': 0, 'spills': 0, 'reloads': 0}
+        CACHES.append(self)
+
+    def get(self, key):
+        """Return the cached value for key (reloading it if spilled), or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            entry['used'] = time.monotonic()
+            self.stats['hits'] += 1
+            if entry['value'] is None:
+                self.reload(entry)
+            return entry['value']
+
+    def get_or_create(self, key, builder):
+        """Return the cached value for key, building (or reloading) it if needed
+
+        Only the first caller that misses a key runs the builder; callers that
+        miss it while it is being built wait for that result (or exception).
+        """
+        with self.lock:
+            value = self.get(key)
+            if value is not None:
+                return value
+            pending = self.building.get(key)
+            if pending is None:
+                self.stats['misses'] += 1
+                future = self.building[key] = Future()
+            else:
+                self.stats['waits'] += 1
+        if pending is not None:
+            return pending.result()
+
+        try:
+            value = self.put(key, builder())
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            with self.lock:
+                del self.building[key]
+        enforce_budget()
+        return value
+
+    def put(self, key, value):
+        """Insert a value unless the key is already cached; return the cached value"""
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = {'value': value, 'regions': memory_regions(value),
+                                     'used': time.monotonic(), 'path': None, 'disk': 0}
+            entry = self.entries[key]
+            if entry['value'] is None:
+                self.reload(entry)
+            return entry['value']
+
+    def reload(self, entry):
+        """Map a spilled entry back in (zero-copy over the memory-mapped file)"""
+        # The table's buffers keep the memory map open for as long as they are used
+        table = pa.ipc.open_file(pa.memory_map(entry['path'], 'r')).read_all()
+        if entry['kind'] == 'table':
+            entry['value'] = table
+        else:
+            entry['value'] = table.to_pandas(types_mapper=arrow_or_categorical)
+        entry['regions'] = memory_regions(entry['value'])
+        self.stats['reloads'] += 1
+
+    def release_coldest(self, now):
+        """Evict or spill the least recently used entry that owns memory; return bytes freed
+
+        Entries used within the cool-down are kept, and so are entries whose
+        memory is still referenced by other cached entries (releasing them
+        would free nothing).
+        """
+        with self.lock:
+            for key, entry in self.entries.items():
+                if entry['value'] is None or now - entry['used'] < COOL_DOWN:
+                    continue
+                freed = exclusive_bytes(entry)
+                if not freed:
+                    continue
+                if not self.spillable:
+                    del self.entries[key]
+                    self.stats['evictions'] += 1
+                    return freed
+                if entry['path'] is None:
+                    self.spill(entry)
+                entry['value'] = None
+                entry['regions'] = {}
+                self.stats['spills'] += 1
+                return freed
+        return 0
+
+    def spill(self, entry):
+        """Write an entry's table (or frame) to an uncompressed Arrow IPC file"""
+        os.makedirs(SPILL_DIR, exist_ok=True)
+        entry['path'] = os.path.join(SPILL_DIR, f'{os.getpid()}-{next(spill_counter)}.arrow')
+        if isinstance(entry['value'], pa.Table):
+            entry['kind'], table = 'table', entry['value']
+        else:
+            entry['kind'], table = 'frame', pa.Table.from_pandas(entry['value'])
+        with pa.OSFile(entry['path'], 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        entry['disk'] = os.path.getsize(entry['path'])
+
+    def live_entries(self):
+        """Entries currently held in memory"""
+        with self.lock:
+            return [e for e in self.entries.values() if e['value'] is not None]
+
+    def usage(self, counted):
+        """Per-cache accounting for the dashboard panel
+
+        Memory already attributed to an earlier cache (`counted`, updated in
+        place) is not counted again, so views only show what they own.
+        """
+        with self.lock:
+            in_memory = self.live_entries()
+            spilled = [e for e in self.entries.values() if e['value'] is None]
+            owned = {}
+            for entry in in_memory:
+                owned.update((address, size) for address, size in entry['regions'].items()
+                             if address not in counted)
+            counted.update(owned)
+            return dict({
+                'Cache': self.name,
+                'Entries': len(self.entries),
+                'In memory (MB)': round(sum(owned.values()) / MB, 2),
+                'Spilled': len(spilled),
+                'On disk (MB)': round(sum(e['disk'] for e in spilled) / MB, 2),
+            }, **self.stats)
+
+    def clear(self):
+        """Drop all entries and their spill files"""
+        with self.lock:
+            for entry in self.entries.values():
+                if entry['path'] and os.path.exists(entry['path']):
+                    os.remove(entry['path'])
+            self.entries.clear()
+
+
+def exclusive_bytes(entry):
+    """Bytes of an entry's memory that no other in-memory cached entry references"""
+    shared = set()
+    for cache in CACHES:
+        for other in cache.live_entries():
+            if other is not entry:
+                shared.update(other['regions'])
+    return sum(size for address, size in entry['regions'].items() if address not in shared)
+
+
+# Release order when over budget: figures, then views, then base tables and derived columns
+CACHES = []
+TABLE_CACHE = BudgetedCache('tables', spillable=True)
+FRAME_CACHE = BudgetedCache('frames', spillable=True)
+FIGURE_CACHE = BudgetedCache('figures', spillable=False)
+RELEASE_ORDER = [FIGURE_CACHE, FRAME_CACHE, TABLE_CACHE]
+
+budget_lock = threading.Lock()
+last_pass = {'time': -float('inf'), 'rss': 0}
+
+
+def enforce_budget(budget=None):
+    """Evict figures, then spill frames and tables, until usage is below the low-water mark"""
+    budget = MEMORY_BUDGET if budget is None else budget
+    with budget_lock:
+        rss = sample_rss()
+        now = time.monotonic()
+        if rss <= budget or now - last_pass['time'] < COOL_DOWN or rss <= last_pass['rss']:
+            return 0
+        last_pass['time'], last_pass['rss'] = now, rss
+
+        # RSS does not drop right away when objects are freed, so count what we release
+        over, freed = rss - budget * LOW_WATER_FRACTION, 0
+        for cache in RELEASE_ORDER:
+            while freed < over:
+                released = cache.release_coldest(now)
+                if not released:
+                    break
+                freed += released
+        return freed
+
+
+def cached_figure(key, builder):
+    """Figure dict from the budgeted figure cache (evicted first when over budget)
+
+    Returns a private copy: plotly temporarily pops keys out of the dicts it
+    validates (st.plotly_chart does), which breaks a dict shared by sessions.
+    """
+    return copy.deepcopy(FIGURE_CACHE.get_or_create(key, builder))
+
+
+def memory_usage():
+    """Current usage per cache (memory shared with an earlier cache is not counted twice)"""
+    counted = {}
+    return pd.DataFrame([cache.usage(counted) for cache in CACHES])
+
+
+def render_memory_panel():
+    """Show process memory against the budget and usage per cache"""
+    rss = sample_rss()
+    col1, col2 = st.columns(2)
+    col1.metric("Process RSS (MB)", f"{rss / MB:,.0f}")
+    col2.metric("Budget (MB)", f"{MEMORY_BUDGET / MB:,.0f}")
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        st.caption(f"tracemalloc: {current / MB:,.1f} MB current, {peak / MB:,.1f} MB peak")
+    st.dataframe(memory_usage(), hide_index=True)
+    if len(RSS_SAMPLES) > 1:
+        history = pd.DataFrame(RSS_SAMPLES, columns=['Time', 'RSS (MB)'])
+        history['Time'] = pd.to_datetime(history['Time'], unit='s')
+        history['RSS (MB)'] = history['RSS (MB)'] / MB
+        st.line_chart(history, x='Time', y='RSS (MB)', height=150)
+
+
+atexit.register(lambda: [cache.clear() for cache in CACHES])
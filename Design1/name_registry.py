@@ -0,0 +1,308 @@
+# Canonical Nagara/Vasati names across years, Bhagas and data sources
+#
+# The same Vasati shows up with spelling and transliteration variants
+# ("Saraswati nagara" / "Saraswathi Nagar"), which breaks groupbys and
+# year-over-year joins. The registry keeps the canonical spellings (Vasatis
+# are scoped by their canonical Nagara) plus manual overrides in a JSON file
+# next to this module, whatever the data source (workbook or form exports).
+#
+# Matching an incoming name:
+#   1. manual override, 2. exact match on a folded key (case, punctuation,
+#   initials such as "I.T." / "IT", common transliteration variants), 3. fuzzy
+#   match through a character trigram index: only canonical names sharing
+#   trigrams with the query are scored (Dice coefficient), so there is no
+#   pairwise comparison of all names. Equal scores go to the canonical name
+#   registered first. Fuzzy matches should be reviewed (see the CLI).
+# Results are cached in a second JSON file, keyed by a fingerprint of the
+# registry and the matching rules, so unchanged names are not re-matched on
+# the next run.
+#
+# Only the CLI and explicit registry edits (add_canonical / set_override
+# followed by save) write the registry; reading data writes at most the match
+# cache. Both files are replaced atomically, so concurrent readers never see
+# a partially written file.
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+from collections import Counter, defaultdict
+
+REGISTRY_FILE = 'name_registry.json'
+CACHE_FILE = 'name_match_cache.json'
+
+# Default location of the registry and match cache
+REGISTRY_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Minimum Dice similarity of trigram sets for a fuzzy match
+MATCH_THRESHOLD = 0.7
+
+# Bump when fold_name/lookup change so cached matches are recomputed
+MATCHER_VERSION = 2
+
+# Transliteration variants folded to one spelling, applied in order
+FOLDS = [('sh', 's'), ('th', 't'), ('dh', 'd'), ('bh', 'b'), ('kh', 'k'), ('gh', 'g'),
+         ('ph', 'p'), ('ch', 'c'), ('aa', 'a'), ('ee', 'i'), ('oo', 'u'), ('w', 'v'), ('z', 'j')]
+
+# Serialises writes of the registry files within the process
+write_lock = threading.Lock()
+
+
+def write_json(path, data, **options):
+    """Write JSON to a temporary file next to `path`, then move it into place"""
+    with write_lock:
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path),
+                                         prefix=os.path.basename(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, **options)
+            # mkstemp creates the file private to the owner; keep the usual permissions
+            os.chmod(temp_path, os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+
+def fold_name(name):
+    """Reduce a name to a comparison key (case, spacing, punctuation, transliteration folded)"""
+    # Runs of single letters are initials: "I.T." / "I T" / "IT" -> "it"
+    words = []
+    for word in re.findall(r'[^\W_]+', str(name).casefold()):
+        if len(word) == 1 and words and words[-1][1]:
+            words[-1] = (words[-1][0] + word, True)
+        else:
+            words.append((word, len(word) == 1))
+
+    tokens = []
+    for token, _ in words:
+        for old, new in FOLDS:
+            token = token.replace(old, new)
+        # Nagara/Nagar, Halli/Hally: drop a trailing vowel
+        tokens.append(token.rstrip('aeiouy') or token)
+    return ' '.join(tokens)
+
+
+def trigrams(key):
+    """Character trigrams of a folded key, padded at word boundaries"""
+    padded = f' {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameRegistry:
+    """Canonical names, manual overrides and a trigram index for fuzzy matching"""
+
+    def __init__(self, folder=REGISTRY_DIR):
+        self.registry_path = os.path.join(folder, REGISTRY_FILE)
+        self.cache_path = os.path.join(folder, CACHE_FILE)
+        # kind ('Nagara' / 'Vasati') -> scope ('' / canonical Nagara) -> names
+        self.canonical = {'Nagara': {}, 'Vasati': {}}
+        self.overrides = {'Nagara': {}, 'Vasati': {}}
+        self.cache = {'Nagara': {}, 'Vasati': {}}
+        self.indexes = {}
+        self.changed = False
+
+        if os.path.exists(self.registry_path):
+            with open(self.registry_path, encoding='utf-8') as f:
+                data = json.load(f)
+            self.canonical = data['canonical']
+            self.overrides = data['overrides']
+
+        if os.path.exists(self.cache_path):
+            with open(self.cache_path, encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('registry') == self.fingerprint():
+                self.cache = cached['matches']
+
+    def fingerprint(self):
+        """Hash of the canonical names, overrides and matching rules (invalidates the match cache)"""
+        data = json.dumps([self.canonical, self.overrides, MATCHER_VERSION, MATCH_THRESHOLD, FOLDS],
+                          sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def save(self):
+        """Persist the registry (canonical names, overrides) and the match cache"""
+        write_json(self.registry_path, {'canonical': self.canonical, 'overrides': self.overrides},
+                   indent=2, sort_keys=True)
+        self.save_cache()
+
+    def save_cache(self):
+        """Persist the match cache only (the registry file is left alone)"""
+        write_json(self.cache_path, {'registry': self.fingerprint(), 'matches': self.cache})
+        self.changed = False
+
+    def invalidate(self, kind, scope):
+        """Drop the index and cached matches affected by a registry change"""
+        self.indexes.pop((kind, scope), None)
+        self.cache[kind].pop(scope, None)
+        self.changed = True
+
+    def add_canonical(self, kind, name, nagara=''):
+        """Register a canonical spelling (Vasatis are scoped by their Nagara)"""
+        scope = nagara if kind == 'Vasati' else ''
+        names = self.canonical[kind].setdefault(scope, [])
+        name = str(name).strip()
+        if name not in names:
+            names.append(name)
+            self.invalidate(kind, scope)
+
+    def set_override(self, kind, variant, canonical, nagara=''):
+        """Always map `variant` to `canonical`, regardless of fuzzy matching"""
+        scope = nagara if kind == 'Vasati' else ''
+        self.overrides[kind].setdefault(scope, {})[str(variant).strip()] = canonical
+        self.invalidate(kind, scope)
+
+    def index(self, kind, scope):
+        """Build (once) the folded-key lookup and trigram index for one scope"""
+        if (kind, scope) not in self.indexes:
+            exact = {}
+            grams = defaultdict(list)
+            sizes = []
+            names = self.canonical[kind].get(scope, [])
+            for i, name in enumerate(names):
+                key = fold_name(name)
+                exact.setdefault(key, name)
+                name_grams = trigrams(key)
+                sizes.append(len(name_grams))
+                for gram in name_grams:
+                    grams[gram].append(i)
+            overrides = {fold_name(variant): canonical
+                         for variant, canonical in self.overrides[kind].get(scope, {}).items()}
+            self.indexes[(kind, scope)] = (names, exact, grams, sizes, overrides)
+        return self.indexes[(kind, scope)]
+
+    def lookup(self, kind, name, scope):
+        """Match one name against one scope, or None if nothing is close enough"""
+        names, exact, grams, sizes, overrides = self.index(kind, scope)
+        key = fold_name(name)
+        if key in overrides:
+            return overrides[key]
+        if key in exact:
+            return exact[key]
+
+        # Blocking: only score canonical names sharing at least one trigram
+        query = trigrams(key)
+        shared = Counter()
+        for gram in query:
+            shared.update(grams.get(gram, ()))
+        # Highest score wins; ties go to the canonical name registered first
+        best, best_score = None, MATCH_THRESHOLD
+        for i, count in sorted(shared.items()):
+            score = 2 * count / (len(query) + sizes[i])
+            if score > best_score or (best is None and score == best_score):
+                best, best_score = names[i], score
+        return best
+
+    def match(self, kind, name, nagara=''):
+        """Canonical spelling of a Nagara or Vasati name, or None if unknown"""
+        scope = nagara if kind == 'Vasati' else ''
+        name = str(name).strip()
+        cached = self.cache[kind].setdefault(scope, {})
+        if name not in cached:
+            cached[name] = self.lookup(kind, name, scope)
+            self.changed = True
+        return cached[name]
+
+    def match_method(self, kind, name, nagara=''):
+        """How a name is matched: 'override', 'exact', 'fuzzy', or None if unknown"""
+        scope = nagara if kind == 'Vasati' else ''
+        _, exact, _, _, overrides = self.index(kind, scope)
+        key = fold_name(name)
+        if key in overrides:
+            return 'override'
+        if key in exact:
+            return 'exact'
+        return 'fuzzy' if self.match(kind, name, nagara) is not None else None
+
+    def seed(self, sheets):
+        """Register every Nagara/Vasati spelling found in the sheets as canonical"""
+        for df in sheets.values():
+            if 'Nagara' not in df.columns:
+                continue
+            if 'Vasati' in df.columns:
+                for nagara, vasati in df[['Nagara', 'Vasati']].dropna().drop_duplicates().itertuples(index=False):
+                    self.add_canonical('Nagara', nagara)
+                    self.add_canonical('Vasati', vasati, nagara=str(nagara).strip())
+            else:
+                for nagara in df['Nagara'].dropna().unique():
+                    self.add_canonical('Nagara', nagara)
+
+
+def normalise_names(sheets, registry):
+    """Return the sheets with Nagara/Vasati replaced by their canonical spellings
+
+    Each distinct name is matched once and the result mapped back onto the
+    column, so the cost depends on the number of distinct names, not rows.
+    Names that match nothing are kept as they are (stripped). New matches
+    are saved to the match cache; the registry file itself is never written.
+    """
+    normalised = {}
+    for sheet, df in sheets.items():
+        if 'Nagara' in df.columns:
+            nagaras = df['Nagara'].dropna().unique()
+            mapping = {name: registry.match('Nagara', name) or str(name).strip() for name in nagaras}
+            df = df.assign(Nagara=df['Nagara'].map(mapping))
+            if 'Vasati' in df.columns:
+                pairs = df[['Nagara', 'Vasati']].dropna().drop_duplicates()
+                vasati_mapping = {
+                    (nagara, vasati): registry.match('Vasati', vasati, nagara=nagara) or str(vasati).strip()
+                    for nagara, vasati in pairs.itertuples(index=False)}
+                keys = list(zip(df['Nagara'], df['Vasati']))
+                df = df.assign(Vasati=[vasati_mapping.get(key, key[1]) for key in keys])
+        normalised[sheet] = df
+
+    if registry.changed:
+        registry.save_cache()
+    return normalised
+
+
+def names_to_review(sheets, registry):
+    """List the names that are fuzzy-matched or unmatched: (sheet, kind, nagara, name, canonical)
+
+    `canonical` is None for names without a match.
+    """
+    rows = []
+    for sheet, df in sheets.items():
+        if 'Nagara' not in df.columns:
+            continue
+        for nagara in df['Nagara'].dropna().unique():
+            if registry.match_method('Nagara', nagara) in ('fuzzy', None):
+                rows.append((sheet, 'Nagara', '', nagara, registry.match('Nagara', nagara)))
+        if 'Vasati' in df.columns:
+            pairs = df[['Nagara', 'Vasati']].dropna().drop_duplicates()
+            for nagara, vasati in pairs.itertuples(index=False):
+                canonical_nagara = registry.match('Nagara', nagara) or str(nagara).strip()
+                if registry.match_method('Vasati', vasati, nagara=canonical_nagara) in ('fuzzy', None):
+                    rows.append((sheet, 'Vasati', canonical_nagara, vasati,
+                                 registry.match('Vasati', vasati, nagara=canonical_nagara)))
+    return rows
+
+
+# Main execution
+if __name__ == "__main__":
+    from shared_data import read_sheets
+
+    # Usage: python name_registry.py <workbook or export directory> [--seed]
+    args = [arg for arg in sys.argv[1:] if arg != '--seed']
+    file_path = args[0] if args else "Vijayadashami_VIJ_2025.xlsx"
+    registry = NameRegistry()
+    sheets = read_sheets(file_path, normalise=False)
+
+    if '--seed' in sys.argv or not os.path.exists(registry.registry_path):
+        registry.seed(sheets)
+        registry.save()
+        print(f"✅ Canonical names saved in '{registry.registry_path}'")
+
+    review = names_to_review(sheets, registry)
+    registry.save_cache()
+    for sheet, kind, nagara, name, canonical in review:
+        where = f" in {nagara}" if nagara else ""
+        if canonical is None:
+            print(f"{sheet}: unknown {kind} '{name}'{where}")
+        else:
+            print(f"{sheet}: fuzzy {kind} '{name}' -> '{canonical}'{where}")
+    fuzzy = sum(1 for row in review if row[4] is not None)
+    print(f"{fuzzy} fuzzy substitutions to review (add overrides to pin them), "
+          f"{len(review) - fuzzy} names without a canonical match")
@@ -0,0 +1,148 @@
+# Shared, read-only dataset for the Streamlit dashboards (design2.py / design3.py)
+#
+# Every Streamlit session runs as a thread inside the same server process, so
+# anything cached in the process is shared by all of them without the
+# pickle/unpickle copy that st.cache_data makes on every call. The workbook is
+# loaded once into immutable Arrow tables and handed out as Arrow-backed pandas
+# frames (zero-copy over the Arrow buffers). Derived columns such as
+# Representation_Rate or Bin are computed once and shared by every view that
+# overlays them, so memory grows with the number of views, not the number of sessions.
+#
+# Each call to shared_view returns a shallow copy of the cached view: the data
+# is shared, but assigning columns or modifying values (pandas copy-on-write)
+# stays local to the caller's frame. Ask for a view with the derived columns
+# you need rather than computing them per session. Base tables
+# and derived columns live in memory_budget.TABLE_CACHE and views in
+# memory_budget.FRAME_CACHE, so cold ones are spilled to disk under memory pressure.
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+
+from ingest import read_exports
+from memory_budget import FRAME_CACHE, TABLE_CACHE
+from name_registry import NameRegistry, normalise_names
+
+SHEET_NAMES = ['Sheet3', 'Sheet8']
+
+# Custom bins for Grand Total: [0,9], [10,24], [25,50], [51,74], [75,99], [100,500]
+BIN_EDGES = [0, 10, 25, 51, 75, 100, 501]
+BIN_LABELS = ['0-9', '10-24', '25-50', '51-74', '75-99', '100-500']
+
+# file path -> lock held while that workbook (or export directory) is read
+read_locks = {}
+
+
+def read_sheets(file_path, normalise=True, registry=None):
+    """Read and clean Sheet3 and Sheet8 into plain pandas DataFrames
+
+    `file_path` is the workbook or a directory of CSV/JSON/Parquet form
+    exports (read with the Arrow readers in ingest.py). With `normalise`,
+    Nagara/Vasati names are mapped to their canonical spellings from the
+    name registry (by default the one next to name_registry.py; while there
+    is none it is seeded in memory from the workbook, exports never seed it).
+    Reading only ever writes the registry's match cache.
+    """
+    if os.path.isdir(file_path):
+        raw = read_exports(file_path)
+    else:
+        raw = pd.read_excel(file_path, sheet_name=SHEET_NAMES, engine='openpyxl')
+    sheets = {name: clean_sheet(df) for name, df in raw.items()}
+    if normalise:
+        registry = registry or NameRegistry()
+        if not os.path.exists(registry.registry_path) and not os.path.isdir(file_path):
+            registry.seed(sheets)
+        sheets = normalise_names(sheets, registry)
+    return sheets
+
+
+def clean_sheet(df):
+    """Apply the cleaning shared by all dashboards to one sheet"""
+    df = df.dropna(how='all').reset_index(drop=True)
+    df.columns = df.columns.str.strip()
+    if 'Nagara' in df.columns:
+        df['Nagara'] = df['Nagara'].str.strip()
+    if 'Grand Total' in df.columns:
+        df['Grand Total'] = pd.to_numeric(df['Grand Total'], errors='coerce').fillna(0)
+    return df
+
+
+def load_shared_tables(file_path):
+    """Load the workbook as immutable Arrow tables into the budgeted table cache
+
+    Each file is read once: concurrent callers (asking for different sheets)
+    wait for the first read and get the tables it cached.
+    """
+    with read_locks.setdefault(file_path, threading.Lock()):
+        tables = {name: TABLE_CACHE.get(('table', file_path, name)) for name in SHEET_NAMES}
+        if any(table is None for table in tables.values()):
+            tables = {name: TABLE_CACHE.put(('table', file_path, name),
+                                            pa.Table.from_pandas(df, preserve_index=False))
+                      for name, df in read_sheets(file_path).items()}
+        return tables
+
+
+def shared_table(file_path, sheet_name):
+    """One sheet as a shared Arrow table (read once, reloaded from disk if spilled)"""
+    return TABLE_CACHE.get_or_create(('table', file_path, sheet_name),
+                                     lambda: load_shared_tables(file_path)[sheet_name])
+
+
+def shared_frame(file_path, sheet_name):
+    """Return an Arrow-backed pandas frame over the shared table (no data copy)"""
+    return shared_table(file_path, sheet_name).to_pandas(types_mapper=pd.ArrowDtype)
+
+
+# Derived columns: name -> (required source columns, function of the frame)
+DERIVED_COLUMNS = {
+    'Representation_Rate': (
+        ['Total Booths', 'Represented Booths'],
+        lambda df: (df['Represented Booths'] / df['Total Booths'] * 100).round(1)),
+    'Efficiency': (
+        ['Grand Total', 'Total Vasati'],
+        lambda df: (df['Grand Total'] / df['Total Vasati']).round(1)),
+    'Bin': (
+        ['Grand Total'],
+        lambda df: pd.cut(df['Grand Total'], bins=BIN_EDGES, labels=BIN_LABELS,
+                          right=False, include_lowest=True)),
+}
+
+
+def derived_column(file_path, sheet_name, column):
+    """Compute one derived column once (kept in the table cache), or None if its inputs are missing"""
+    required, func = DERIVED_COLUMNS[column]
+    df = shared_frame(file_path, sheet_name)
+    if not all(col in df.columns for col in required):
+        return None
+    values = TABLE_CACHE.get_or_create(('derived', file_path, sheet_name, column),
+                                       lambda: func(df).to_frame(column))
+    return values[column]
+
+
+def shared_view(file_path, sheet_name, derived=(), sort_by=None, ascending=True):
+    """Return a view of a sheet with derived columns overlaid
+
+    The base columns still point at the shared Arrow buffers; only the overlay
+    columns and the (optional) sort order are specific to this view. The
+    caller gets its own shallow copy, so changes to it never reach other sessions.
+    """
+    key = (file_path, sheet_name, tuple(derived), sort_by, ascending)
+    view = FRAME_CACHE.get_or_create(
+        key, lambda: build_view(file_path, sheet_name, derived, sort_by, ascending))
+    return view.copy(deep=False)
+
+
+def build_view(file_path, sheet_name, derived, sort_by, ascending):
+    """Build one view for shared_view (runs once per distinct view)"""
+    df = shared_frame(file_path, sheet_name)
+    overlay = {}
+    for column in derived:
+        values = derived_column(file_path, sheet_name, column)
+        if values is not None:
+            overlay[column] = values
+    if overlay:
+        df = df.assign(**overlay)
+    if sort_by is not None:
+        df = df.sort_values(sort_by, ascending=ascending).reset_index(drop=True)
+    return df
@@ -0,0 +1,266 @@
+# Rule-based data-quality validation for incoming Vijayadashami workbooks
+#
+# Every rule is a vectorised column expression that returns True for the rows
+# that violate it, so a 100k-row export is checked in a handful of column
+# passes instead of a Python loop per row. Row rules only look at one row;
+# group rules (duplicates, Sheet3 <-> Sheet8 rollups) look across rows/sheets,
+# but only ever compare rows of the same Nagara.
+#
+# Count columns are checked as nullable floats, whatever the frame's dtype
+# backend (numpy from read_excel, Arrow from the shared tables): a missing
+# count is reported once by its own rule and never counts as a mismatch.
+#
+# validate() returns a state dict that can be passed back in as `previous`.
+# When the sheets have the same rows and columns as last time, rows are
+# compared column by column with the previous data: row rules only run on
+# the changed rows, group rules only on the Nagaras those rows belong to (before
+# and after the change), and all other violations are carried over.
+import sys
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from ingest import SHEET_COLUMNS
+from shared_data import SHEET_NAMES, read_sheets, shared_frame
+
+# Columns that are not counts
+LABEL_COLUMNS = ['Sl No', 'Nagara', 'Grade', 'Vasati']
+
+COUNT_COLUMNS = {sheet: [column for column in columns if column not in LABEL_COLUMNS]
+                 for sheet, columns in SHEET_COLUMNS.items()}
+
+
+def missing_counts(df, sheet):
+    """Rows with a blank (or non-numeric) count"""
+    columns = [column for column in COUNT_COLUMNS[sheet] if column in df.columns]
+    return df[columns].isna().any(axis=1)
+
+
+# Row rules: (rule, sheet, required columns, message, check returning True for bad rows)
+ROW_RULES = [
+    ('utsava_missing', 'Sheet8', [],
+     'Count is missing or not a number',
+     lambda df: missing_counts(df, 'Sheet8')),
+    ('utsava_total', 'Sheet8', ['Tarun', 'Balak', 'Total'],
+     'Tarun + Balak does not match Total',
+     lambda df: df['Tarun'] + df['Balak'] != df['Total']),
+    ('utsava_grand_total', 'Sheet8', ['Total', 'Shishu', 'Rest', 'Women', 'Grand Total'],
+     'Total + Shishu + Rest + Women does not match Grand Total',
+     lambda df: df['Total'] + df['Shishu'] + df['Rest'] + df['Women'] != df['Grand Total']),
+    ('utsava_booths', 'Sheet8', ['Total Booths', 'Represented Booths'],
+     'Represented Booths is greater than Total Booths',
+     lambda df: df['Represented Booths'] > df['Total Booths']),
+    ('utsava_shakha', 'Sheet8', ['Shakha', 'Represented Shakha'],
+     'Represented Shakha is greater than Shakha',
+     lambda df: df['Represented Shakha'] > df['Shakha']),
+    ('utsava_milan', 'Sheet8', ['Milan', 'Represented Milan'],
+     'Represented Milan is greater than Milan',
+     lambda df: df['Represented Milan'] > df['Milan']),
+    ('utsava_negative', 'Sheet8', [],
+     'Negative count',
+     lambda df: (df.select_dtypes('number') < 0).any(axis=1)),
+    ('sanchalana_missing', 'Sheet3', [],
+     'Count is missing or not a number',
+     lambda df: missing_counts(df, 'Sheet3')),
+    ('sanchalana_c_total', 'Sheet3', ['Taruna-C', 'balaka-C', 'Total-C'],
+     'Taruna-C + balaka-C does not match Total-C',
+     lambda df: df['Taruna-C'] + df['balaka-C'] != df['Total-C']),
+    ('sanchalana_p_total', 'Sheet3', ['Taruna-P', 'balaka-P', 'Total-P'],
+     'Taruna-P + balaka-P does not match Total-P',
+     lambda df: df['Taruna-P'] + df['balaka-P'] != df['Total-P']),
+    ('sanchalana_grand_total', 'Sheet3', ['Total-C', 'Total-P', 'Grand Total'],
+     'Total-C + Total-P does not match Grand Total',
+     lambda df: df['Total-C'] + df['Total-P'] != df['Grand Total']),
+    ('sanchalana_vasati', 'Sheet3', ['Total Vasati', 'Represented Vasati'],
+     'Represented Vasati is greater than Total Vasati',
+     lambda df: df['Represented Vasati'] > df['Total Vasati']),
+    ('sanchalana_booths', 'Sheet3', ['Total Booths', 'Represented Booths'],
+     'Represented Booths is greater than Total Booths',
+     lambda df: df['Represented Booths'] > df['Total Booths']),
+    ('sanchalana_negative', 'Sheet3', [],
+     'Negative count',
+     lambda df: (df.drop(columns=['Sl No'], errors='ignore').select_dtypes('number') < 0).any(axis=1)),
+]
+
+
+def rollup_mismatch(sheets, column):
+    """Flag Sheet3 Nagaras whose column does not match the Sheet8 sum for that Nagara"""
+    df3, df8 = sheets['Sheet3'], sheets['Sheet8']
+    rollup = df8.groupby('Nagara')[column].sum()
+    return df3['Nagara'].map(rollup).fillna(0) != df3[column]
+
+
+# Group rules: (rule, sheet reported on, {sheet: required columns}, message, check on all sheets)
+# A group rule must only compare rows of the same Nagara (see validate)
+GROUP_RULES = [
+    ('duplicate_vasati', 'Sheet8', {'Sheet8': ['Nagara', 'Vasati']},
+     'Nagara/Vasati pair appears more than once',
+     lambda sheets: sheets['Sheet8'].duplicated(['Nagara', 'Vasati'], keep=False)),
+    ('booth_rollup', 'Sheet3', {'Sheet3': ['Nagara', 'Total Booths'],
+                                'Sheet8': ['Nagara', 'Total Booths']},
+     'Total Booths does not match the Sheet8 rollup for this Nagara',
+     lambda sheets: rollup_mismatch(sheets, 'Total Booths')),
+    ('represented_booth_rollup', 'Sheet3', {'Sheet3': ['Nagara', 'Represented Booths'],
+                                            'Sheet8': ['Nagara', 'Represented Booths']},
+     'Represented Booths does not match the Sheet8 rollup for this Nagara',
+     lambda sheets: rollup_mismatch(sheets, 'Represented Booths')),
+]
+
+ROW_RULE_NAMES = [rule for rule, *_ in ROW_RULES]
+
+REPORT_COLUMNS = ['Sheet', 'Row', 'Nagara', 'Vasati', 'Rule', 'Message']
+
+REPORT_DTYPES = {'Sheet': 'str', 'Row': 'int64', 'Nagara': object, 'Vasati': object,
+                 'Rule': 'str', 'Message': 'str'}
+
+
+def as_counts(sheet, df):
+    """The sheet with its count columns as nullable floats (blank or non-numeric -> NA)"""
+    columns = [column for column in COUNT_COLUMNS.get(sheet, []) if column in df.columns]
+    return df.assign(**{column: pd.to_numeric(df[column], errors='coerce').astype('Float64')
+                        for column in columns})
+
+
+def violations_frame(sheet, df, rows, rule, message):
+    """Build violation records (labelled with Nagara/Vasati) for the given row labels"""
+    found = pd.DataFrame({'Sheet': sheet, 'Row': rows, 'Rule': rule, 'Message': message})
+    for label in ['Nagara', 'Vasati']:
+        found[label] = df[label].loc[rows].to_numpy() if label in df.columns else None
+    return found
+
+
+def flagged(mask):
+    """Turn a (possibly nullable) comparison result into a plain boolean mask"""
+    return mask.fillna(False).astype(bool)
+
+
+def check_rows(sheet, df):
+    """Evaluate all row rules for one sheet over the given rows"""
+    found = []
+    df = as_counts(sheet, df)
+    for rule, rule_sheet, required, message, check in ROW_RULES:
+        if rule_sheet != sheet or df.empty or not all(col in df.columns for col in required):
+            continue
+        rows = df.index[flagged(check(df)).to_numpy()]
+        if len(rows):
+            found.append(violations_frame(sheet, df, rows, rule, message))
+    return found
+
+
+def check_groups(sheets):
+    """Evaluate all group rules across the sheets"""
+    found = []
+    sheets = {name: as_counts(name, df) for name, df in sheets.items()}
+    for rule, sheet, required, message, check in GROUP_RULES:
+        if not all(name in sheets and all(col in sheets[name].columns for col in cols)
+                   for name, cols in required.items()):
+            continue
+        df = sheets[sheet]
+        rows = df.index[flagged(check(sheets)).to_numpy()]
+        if len(rows):
+            found.append(violations_frame(sheet, df, rows, rule, message))
+    return found
+
+
+def changed_rows(sheets, previous):
+    """Per sheet, a mask of rows that differ from the previous run (None: check everything)"""
+    if previous is None or previous['sheets'].keys() != sheets.keys():
+        return None
+    changed = {}
+    for sheet, df in sheets.items():
+        old = previous['sheets'][sheet]
+        if df is old:
+            changed[sheet] = np.zeros(len(df), dtype=bool)
+            continue
+        # Rows are matched by position: added, removed or reordered rows mean a full run
+        if not (df.index.equals(old.index) and df.columns.equals(old.columns)
+                and df.dtypes.equals(old.dtypes)):
+            return None
+        mask = np.zeros(len(df), dtype=bool)
+        for column in df.columns:
+            new_values, old_values = df[column], old[column]
+            same = flagged(new_values == old_values) | (new_values.isna() & old_values.isna())
+            mask |= ~same.to_numpy()
+        changed[sheet] = mask
+    return changed
+
+
+def finish_report(found):
+    """Combine violation records into the sorted report"""
+    if not found:
+        return pd.DataFrame(columns=REPORT_COLUMNS).astype(REPORT_DTYPES)
+    report = pd.concat(found, ignore_index=True)[REPORT_COLUMNS].astype(REPORT_DTYPES)
+    return report.sort_values(['Sheet', 'Row', 'Rule']).reset_index(drop=True)
+
+
+def validate(sheets, previous=None):
+    """Validate Sheet3/Sheet8 and return the violations report plus state for the next run
+
+    When `previous` (the dict returned by an earlier call) is given, only the
+    changed rows and their Nagaras are re-checked.
+    """
+    changed = changed_rows(sheets, previous)
+    if changed is None:
+        found = [found for sheet, df in sheets.items() for found in check_rows(sheet, df)]
+        report = finish_report(found + check_groups(sheets))
+        return {'report': report, 'sheets': dict(sheets)}
+
+    # Nagaras of the changed rows, before and after the change
+    affected = set()
+    for sheet, df in sheets.items():
+        if 'Nagara' in df.columns and changed[sheet].any():
+            affected.update(df['Nagara'][changed[sheet]].dropna())
+            affected.update(previous['sheets'][sheet]['Nagara'][changed[sheet]].dropna())
+    regrouped = {sheet: df['Nagara'].isin(affected).to_numpy() if 'Nagara' in df.columns
+                 else np.zeros(len(df), dtype=bool)
+                 for sheet, df in sheets.items()}
+
+    # Carry over the violations of rows that are not re-checked
+    report = previous['report']
+    stale = np.zeros(len(report), dtype=bool)
+    is_row_rule = report['Rule'].isin(ROW_RULE_NAMES).to_numpy()
+    for sheet, df in sheets.items():
+        on_sheet = (report['Sheet'] == sheet).to_numpy()
+        positions = df.index.get_indexer(report['Row'])
+        recheck = np.where(is_row_rule, changed[sheet][positions], regrouped[sheet][positions])
+        stale |= on_sheet & recheck
+    found = [report[~stale]]
+
+    for sheet, df in sheets.items():
+        found.extend(check_rows(sheet, df[changed[sheet]]))
+    found.extend(check_groups({sheet: df[regrouped[sheet]] for sheet, df in sheets.items()}))
+    return {'report': finish_report(found), 'sheets': dict(sheets)}
+
+@st.cache_resource
+def shared_validation(file_path):
+    """Validate the shared dataset once per process (at ingest time)"""
+    sheets = {name: shared_frame(file_path, name) for name in SHEET_NAMES}
+    return validate(sheets)
+
+
+def render_validation_panel(report):
+    """Show the violations report as a Streamlit panel"""
+    if report.empty:
+        st.success('All data-quality rules passed')
+        return
+
+    st.warning(f'{len(report)} data-quality violations found')
+    rule_counts = report.groupby(['Sheet', 'Rule', 'Message']).size().reset_index(name='Violations')
+    st.dataframe(rule_counts)
+    st.dataframe(report)
+
+
+# Main execution
+if __name__ == "__main__":
+    file_path = sys.argv[1] if len(sys.argv) > 1 else "Vijayadashami_VIJ_2025.xlsx"
+
+    result = validate(read_sheets(file_path))
+    report = result['report']
+    report.to_csv("vijayadashami_violations.csv", index=False)
+
+    if report.empty:
+        print("✅ All data-quality rules passed")
+    else:
+        print(report.groupby(['Sheet', 'Rule']).size().to_string())
+        print(f"⚠️ {len(report)} violations saved as 'vijayadashami_violations.csv'")